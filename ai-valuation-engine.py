@@ -1,10 +1,20 @@
 import numpy as np
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import multiprocessing as mp
+import hashlib
 import json
+import logging
+import threading
+import time
 import requests
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class ValuationResult:
     valuation: float
@@ -12,6 +22,13 @@ class ValuationResult:
     breakdown: Dict[str, float]
     timestamp: datetime
 
+@dataclass
+class ValuationRange:
+    valuation: float  # deterministic point estimate
+    mean: float
+    std: float
+    percentiles: Dict[float, float]
+
 class TechnicalAnalysisModel:
     def __init__(self):
         self.weights = {
@@ -21,6 +38,46 @@ class TechnicalAnalysisModel:
             'implementation_complexity': 0.2
         }
     
+    # Per-asset inputs gathered into columns by IPValuationEngine.extract_columns.
+    # Claim and description scoring is text-bound: only the raw text is
+    # extracted, and score_text runs wherever the batch is evaluated.
+    SOURCE_FIELDS = ('claims', 'description', 'prior_art', 'technical_details')
+    TEXT_FIELDS = ('claim_strength', 'innovation_level')
+    INPUT_FIELDS = ('prior_art_similarity', 'component_count', 'integration_count', 'algorithm_count')
+    
+    def extract_text(self, ip_data: Dict) -> Tuple[List[str], str]:
+        return ip_data.get('claims', []), ip_data.get('description', '')
+    
+    def score_text(self, claims: List[str], description: str) -> Tuple[float, float]:
+        return self._assess_claim_strength(claims), self._evaluate_innovation(description)
+    
+    def extract_inputs(self, ip_data: Dict) -> Tuple[float, ...]:
+        prior_art = ip_data.get('prior_art', [])
+        technical_details = ip_data.get('technical_details', {})
+        return (
+            # NaN marks "no prior art", which scores 1.0
+            sum(art.get('similarity', 0.5) for art in prior_art) / len(prior_art) if prior_art else np.nan,
+            technical_details.get('component_count', 0),
+            technical_details.get('integration_count', 0),
+            technical_details.get('algorithm_count', 0)
+        )
+    
+    def analyze_batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        similarity = columns['prior_art_similarity']
+        prior_art_density = np.where(np.isnan(similarity), 1.0, np.maximum(0.0, 1.0 - similarity))
+        complexity = np.minimum(1.0,
+            columns['component_count'] * 0.1 +
+            columns['integration_count'] * 0.15 +
+            columns['algorithm_count'] * 0.2
+        )
+        
+        return (
+            columns['claim_strength'] * self.weights['claim_strength'] +
+            columns['innovation_level'] * self.weights['innovation_level'] +
+            prior_art_density * self.weights['prior_art_density'] +
+            complexity * self.weights['implementation_complexity']
+        )
+    
     def analyze(self, ip_data: Dict) -> float:
         claim_strength = self._assess_claim_strength(ip_data.get('claims', []))
         innovation_level = self._evaluate_innovation(ip_data.get('description', ''))
@@ -81,6 +138,54 @@ class MarketAnalysisModel:
             'market_size': 0.25,
             'trend_alignment': 0.2
         }
+        # Simplified market size scoring based on industry
+        self.market_scores = {
+            'software': 0.9,
+            'healthcare': 0.8,
+            'fintech': 0.85,
+            'ai': 0.95,
+            'blockchain': 0.8,
+            'iot': 0.75,
+            'default': 0.5
+        }
+        self.trending_areas = ['ai', 'blockchain', 'quantum', 'biotech', 'clean energy']
+    
+    SOURCE_FIELDS = ('market_data', 'competitors', 'industry', 'technology_area')
+    INPUT_FIELDS = ('technology_readiness', 'adoption_barriers', 'competitor_strength')
+    KEY_FIELDS = ('industry', 'technology_area')
+    
+    def extract_inputs(self, ip_data: Dict) -> Tuple[float, ...]:
+        market_data = ip_data.get('market_data', {})
+        competitors = ip_data.get('competitors', [])
+        return (
+            market_data.get('technology_readiness', 5),
+            market_data.get('adoption_barriers', 5),
+            # NaN marks "no competitors", which scores 1.0
+            sum(comp.get('strength', 0.5) for comp in competitors) / len(competitors) if competitors else np.nan
+        )
+    
+    def extract_keys(self, ip_data: Dict) -> Tuple[str, str]:
+        return ip_data.get('industry', '').lower(), ip_data.get('technology_area', '').lower()
+    
+    def analyze_batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        adoption = (columns['technology_readiness'] / 10.0 + (1.0 - columns['adoption_barriers'] / 10.0)) / 2.0
+        strength = columns['competitor_strength']
+        competition = np.where(np.isnan(strength), 1.0, np.maximum(0.0, 1.0 - strength))
+        # Table lookups run once per distinct industry / technology area
+        market_size = self._score_keys(columns['industry'], self._evaluate_market_size)
+        trends = self._score_keys(columns['technology_area'], self._analyze_trends)
+        
+        return (
+            adoption * self.weights['adoption_potential'] +
+            competition * self.weights['competitive_position'] +
+            market_size * self.weights['market_size'] +
+            trends * self.weights['trend_alignment']
+        )
+    
+    @staticmethod
+    def _score_keys(keys: np.ndarray, score) -> np.ndarray:
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        return np.array([score(key) for key in unique_keys], dtype=np.float64)[inverse].reshape(keys.shape)
     
     def analyze(self, ip_data: Dict) -> float:
         adoption = self._assess_adoption_potential(ip_data.get('market_data', {}))
@@ -108,22 +213,11 @@ class MarketAnalysisModel:
         return max(0.0, 1.0 - competitive_strength)
     
     def _evaluate_market_size(self, industry: str) -> float:
-        # Simplified market size scoring based on industry
-        market_scores = {
-            'software': 0.9,
-            'healthcare': 0.8,
-            'fintech': 0.85,
-            'ai': 0.95,
-            'blockchain': 0.8,
-            'iot': 0.75,
-            'default': 0.5
-        }
-        return market_scores.get(industry.lower(), market_scores['default'])
+        return self.market_scores.get(industry.lower(), self.market_scores['default'])
     
     def _analyze_trends(self, technology_area: str) -> float:
         # Simplified trend analysis
-        trending_areas = ['ai', 'blockchain', 'quantum', 'biotech', 'clean energy']
-        return 0.9 if any(area in technology_area.lower() for area in trending_areas) else 0.5
+        return 0.9 if any(area in technology_area.lower() for area in self.trending_areas) else 0.5
 
 class FinancialAnalysisModel:
     def __init__(self):
@@ -134,6 +228,43 @@ class FinancialAnalysisModel:
             'risk_factor': 0.1
         }
     
+    SOURCE_FIELDS = ('financial_data', 'licensing_data', 'development_data', 'risk_data')
+    INPUT_FIELDS = (
+        'projected_annual_revenue', 'market_penetration',
+        'licensing_potential', 'expected_royalty_rate',
+        'estimated_cost',
+        'technical_risk', 'market_risk', 'regulatory_risk'
+    )
+    
+    def extract_inputs(self, ip_data: Dict) -> Tuple[float, ...]:
+        financial_data = ip_data.get('financial_data', {})
+        licensing_data = ip_data.get('licensing_data', {})
+        risk_data = ip_data.get('risk_data', {})
+        return (
+            financial_data.get('projected_annual_revenue', 0),
+            financial_data.get('market_penetration', 0.01),
+            licensing_data.get('licensing_potential', 0.5),
+            licensing_data.get('expected_royalty_rate', 0.05),
+            ip_data.get('development_data', {}).get('estimated_cost', 1000000),
+            risk_data.get('technical_risk', 0.5),
+            risk_data.get('market_risk', 0.5),
+            risk_data.get('regulatory_risk', 0.3)
+        )
+    
+    def analyze_batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        revenue = np.minimum(1.0, columns['projected_annual_revenue'] * columns['market_penetration'] / 10000000)
+        licensing = np.minimum(1.0, columns['licensing_potential'] * (columns['expected_royalty_rate'] * 10))
+        cost = np.maximum(0.0, 1.0 - columns['estimated_cost'] / 10000000)
+        avg_risk = (columns['technical_risk'] + columns['market_risk'] + columns['regulatory_risk']) / 3.0
+        risk = np.maximum(0.0, 1.0 - avg_risk)
+        
+        return (
+            revenue * self.weights['revenue_potential'] +
+            licensing * self.weights['licensing_opportunity'] +
+            cost * self.weights['development_cost'] +
+            risk * self.weights['risk_factor']
+        )
+    
     def analyze(self, ip_data: Dict) -> float:
         revenue = self._calculate_revenue_potential(ip_data.get('financial_data', {}))
         licensing = self._assess_licensing_opportunity(ip_data.get('licensing_data', {}))
@@ -193,14 +324,176 @@ class ConfidenceScorer:
         
         confidence = (consistency_factor * 0.4 + avg_score * 0.4 + completeness_factor * 0.2) * 100
         return min(100.0, max(0.0, confidence))
+    
+    def calculate_confidence_batch(self, technical: np.ndarray, market: np.ndarray, financial: np.ndarray) -> np.ndarray:
+        scores = np.stack([technical, market, financial])
+        consistency_factor = np.maximum(0.0, 1.0 - scores.var(axis=0) * 2)
+        avg_score = scores.mean(axis=0)
+        completeness_factor = 0.8
+        
+        confidence = (consistency_factor * 0.4 + avg_score * 0.4 + completeness_factor * 0.2) * 100
+        return np.clip(confidence, 0.0, 100.0)
+
+class ModelMemo:
+    # LRU cache of one sub-model's scores, keyed by a stable hash of only the
+    # ip_data fields that model reads (its SOURCE_FIELDS)
+    def __init__(self, model, maxsize: int = 4096):
+        self.model = model
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def key(self, ip_data: Dict) -> str:
+        inputs = {field: ip_data.get(field) for field in self.model.SOURCE_FIELDS}
+        encoded = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def analyze(self, ip_data: Dict) -> float:
+        key = self.key(ip_data)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        
+        score = self.model.analyze(ip_data)
+        with self.lock:
+            self.entries[key] = score
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return score
+    
+    def __getstate__(self):
+        # Locks can't be pickled, and cached scores aren't worth shipping to
+        # spawned workers; a copy starts with an empty memo and fresh lock
+        state = self.__dict__.copy()
+        del state['lock']
+        state['entries'] = OrderedDict()
+        state['hits'] = state['misses'] = 0
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries)}
+
+class PriorArtProvider:
+    # Prior-art similarity from a semantic index: asset text is embedded in
+    # one batch, the FAISS index (L2-normalized vectors, inner product) is
+    # queried with one multi-row search, and mean top-k similarities are
+    # cached by content hash
+    def __init__(self, embedding_model, index, k: int = 10, cache_size: int = 100000,
+                 self_match_threshold: float = 0.999):
+        self.embedding_model = embedding_model
+        self.index = index
+        self.k = k
+        self.cache_size = cache_size
+        # Hits this close are the asset itself, not prior art
+        self.self_match_threshold = self_match_threshold
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        state['cache'] = OrderedDict()
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def text_for(ip_data: Dict) -> str:
+        claims = ip_data.get('claims', [])
+        return f"{ip_data.get('title', '')} {ip_data.get('description', '')} {' '.join(claims)}".strip()
+    
+    def mean_similarities(self, texts: List[str]) -> np.ndarray:
+        # NaN where the index has no usable neighbours ("no prior art")
+        keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest() for text in texts]
+        with self.lock:
+            cached = [self.cache.get(key) for key in keys]
+        missing = {key: text for key, text, value in zip(keys, texts, cached) if value is None}
+        
+        if missing and self.index.ntotal:
+            embeddings = np.asarray(self.embedding_model.encode(list(missing.values())), dtype=np.float32)
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            scores, indices = self.index.search(embeddings, self.k)
+            usable = (indices >= 0) & (scores < self.self_match_threshold)
+            counts = usable.sum(axis=1)
+            means = np.where(counts > 0, np.where(usable, np.clip(scores, 0.0, 1.0), 0.0).sum(axis=1) / np.maximum(counts, 1), np.nan)
+            
+            with self.lock:
+                for key, value in zip(missing, means.tolist()):
+                    self.cache[key] = value
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            computed = dict(zip(missing, means.tolist()))
+        else:
+            computed = dict.fromkeys(missing, np.nan)
+        
+        return np.array([value if value is not None else computed[key] for key, value in zip(keys, cached)],
+                        dtype=np.float64)
+    
+    def prior_art(self, ip_data: Dict) -> List[Dict]:
+        similarity = self.mean_similarities([self.text_for(ip_data)])[0]
+        return [] if np.isnan(similarity) else [{'similarity': similarity}]
+
+# Uncertain inputs for simulate_valuation_ranges: column -> (distribution,
+# scale, (low, high)). 'normal' and 'uniform' add absolute noise with the given
+# standard deviation / half-width; 'lognormal' multiplies by exp(N(0, scale)).
+DEFAULT_PERTURBATIONS = {
+    'technical_risk': ('normal', 0.1, (0.0, 1.0)),
+    'market_risk': ('normal', 0.1, (0.0, 1.0)),
+    'regulatory_risk': ('normal', 0.1, (0.0, 1.0)),
+    'market_penetration': ('lognormal', 0.5, (0.0, 1.0)),
+    'expected_royalty_rate': ('lognormal', 0.3, (0.0, 1.0)),
+    'technology_readiness': ('normal', 1.0, (0.0, 10.0))
+}
+
+# Row layout of batch_evaluate(..., as_array=True)
+VALUATION_DTYPE = np.dtype([
+    ('valuation', np.float64),
+    ('confidence', np.float64),
+    ('technical', np.float64),
+    ('market', np.float64),
+    ('financial', np.float64),
+    ('weighted_score', np.float64)
+])
 
 class IPValuationEngine:
-    def __init__(self):
+    def __init__(self, memo_size: int = 4096, prior_art_provider: Optional[PriorArtProvider] = None):
+        # Assets submitted without a 'prior_art' list get their density from the provider
+        self.prior_art_provider = prior_art_provider
         self.technical_model = TechnicalAnalysisModel()
         self.market_model = MarketAnalysisModel()
         self.financial_model = FinancialAnalysisModel()
         self.confidence_scorer = ConfidenceScorer()
         
+        # Re-submitted assets usually change one section; only the model
+        # reading that section is recomputed
+        self.model_memos = {
+            'technical': ModelMemo(self.technical_model, memo_size),
+            'market': ModelMemo(self.market_model, memo_size),
+            'financial': ModelMemo(self.financial_model, memo_size)
+        }
+        
+        # Tracked portfolio and inverted indexes from market keys to asset
+        # ids, so a market table change revalues only the assets it touches
+        self.portfolio = {}
+        self.industry_index = defaultdict(set)
+        self.technology_area_index = defaultdict(set)
+        
         # Weights for final valuation
         self.model_weights = {
             'technical': 0.4,
@@ -209,10 +502,13 @@ class IPValuationEngine:
         }
     
     def evaluate_ip_asset(self, ip_data: Dict) -> ValuationResult:
+        if self.prior_art_provider and 'prior_art' not in ip_data:
+            ip_data = dict(ip_data, prior_art=self.prior_art_provider.prior_art(ip_data))
+        
         # Analyze each component
-        technical_score = self.technical_model.analyze(ip_data)
-        market_score = self.market_model.analyze(ip_data)
-        financial_score = self.financial_model.analyze(ip_data)
+        technical_score = self.model_memos['technical'].analyze(ip_data)
+        market_score = self.model_memos['market'].analyze(ip_data)
+        financial_score = self.model_memos['financial'].analyze(ip_data)
         
         # Calculate weighted valuation
         weighted_valuation = self.calculate_weighted_score(
@@ -242,6 +538,73 @@ class IPValuationEngine:
             timestamp=datetime.now()
         )
     
+    def track_assets(self, ip_assets: Dict[str, Dict]):
+        for asset_id, ip_data in ip_assets.items():
+            self.untrack_asset(asset_id)
+            industry, technology_area = self.market_model.extract_keys(ip_data)
+            self.portfolio[asset_id] = ip_data
+            self.industry_index[industry].add(asset_id)
+            self.technology_area_index[technology_area].add(asset_id)
+    
+    def untrack_asset(self, asset_id: str):
+        ip_data = self.portfolio.pop(asset_id, None)
+        if ip_data is None:
+            return
+        for index, key in zip((self.industry_index, self.technology_area_index),
+                              self.market_model.extract_keys(ip_data)):
+            index[key].discard(asset_id)
+            if not index[key]:
+                del index[key]
+    
+    def affected_assets(self, market_scores: Optional[Dict[str, float]] = None,
+                        trending_areas: Optional[List[str]] = None) -> Set[str]:
+        # Compares old and new scores per distinct indexed key (a handful of
+        # industries and areas) rather than per asset. market_scores is a
+        # partial update merged over the current table.
+        model = self.market_model
+        affected = set()
+        
+        if market_scores is not None:
+            merged = {**model.market_scores, **market_scores}
+            for industry, asset_ids in self.industry_index.items():
+                if merged.get(industry, merged['default']) != model._evaluate_market_size(industry):
+                    affected |= asset_ids
+        
+        if trending_areas is not None:
+            for technology_area, asset_ids in self.technology_area_index.items():
+                trending = 0.9 if any(area in technology_area for area in trending_areas) else 0.5
+                if trending != model._analyze_trends(technology_area):
+                    affected |= asset_ids
+        
+        return affected
+    
+    def update_market_tables(self, market_scores: Optional[Dict[str, float]] = None,
+                             trending_areas: Optional[List[str]] = None) -> Dict[str, ValuationResult]:
+        # Merge the update into the current tables and revalue only the
+        # tracked assets whose market-size or trend score actually changes.
+        # The old tables are restored if the revaluation fails.
+        model = self.market_model
+        affected = sorted(self.affected_assets(market_scores, trending_areas))
+        old_scores, old_areas = model.market_scores, model.trending_areas
+        
+        if market_scores is not None:
+            model.market_scores = {**old_scores, **market_scores}
+        if trending_areas is not None:
+            model.trending_areas = list(trending_areas)
+        
+        try:
+            results = self.batch_evaluate([self.portfolio[asset_id] for asset_id in affected])
+        except Exception:
+            model.market_scores, model.trending_areas = old_scores, old_areas
+            raise
+        
+        # Cached market scores were computed against the old tables
+        self.model_memos['market'].clear()
+        return dict(zip(affected, results))
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: memo.stats() for name, memo in self.model_memos.items()}
+    
     def calculate_weighted_score(self, technical: float, market: float, financial: float) -> float:
         return (
             technical * self.model_weights['technical'] +
@@ -249,8 +612,286 @@ class IPValuationEngine:
             financial * self.model_weights['financial']
         )
     
-    def batch_evaluate(self, ip_assets: List[Dict]) -> List[ValuationResult]:
-        return [self.evaluate_ip_asset(asset) for asset in ip_assets]
+    @property
+    def input_fields(self) -> Tuple[str, ...]:
+        return (
+            self.technical_model.INPUT_FIELDS +
+            self.market_model.INPUT_FIELDS +
+            self.financial_model.INPUT_FIELDS +
+            ('base_valuation',)
+        )
+    
+    def extract_compact(self, ip_assets: List[Dict]) -> Tuple[np.ndarray, np.ndarray, List[Tuple[List[str], str]]]:
+        # Single pass over the assets: numeric inputs as one float64 matrix,
+        # market keys as strings, and only the claim/description text
+        rows = np.empty((len(ip_assets), len(self.input_fields)), dtype=np.float64)
+        keys = np.empty((len(ip_assets), len(self.market_model.KEY_FIELDS)), dtype=object)
+        texts = []
+        
+        for i, ip_data in enumerate(ip_assets):
+            rows[i] = (
+                self.technical_model.extract_inputs(ip_data) +
+                self.market_model.extract_inputs(ip_data) +
+                self.financial_model.extract_inputs(ip_data) +
+                (ip_data.get('base_valuation', 1000000),)
+            )
+            keys[i] = self.market_model.extract_keys(ip_data)
+            texts.append(self.technical_model.extract_text(ip_data))
+        
+        if self.prior_art_provider:
+            missing = [i for i, ip_data in enumerate(ip_assets) if 'prior_art' not in ip_data]
+            if missing:
+                rows[missing, self.input_fields.index('prior_art_similarity')] = \
+                    self.prior_art_provider.mean_similarities(
+                        [self.prior_art_provider.text_for(ip_assets[i]) for i in missing]
+                    )
+        
+        return rows, keys.astype(str), texts
+    
+    def columns_from_compact(self, rows: np.ndarray, keys: np.ndarray,
+                             texts: List[Tuple[List[str], str]]) -> Dict[str, np.ndarray]:
+        text_scores = np.array(
+            [self.technical_model.score_text(claims, description) for claims, description in texts],
+            dtype=np.float64
+        ).reshape(len(texts), len(self.technical_model.TEXT_FIELDS))
+        
+        columns = dict(zip(self.input_fields, rows.T))
+        columns.update(zip(self.technical_model.TEXT_FIELDS, text_scores.T))
+        columns.update(zip(self.market_model.KEY_FIELDS, keys.T))
+        return columns
+    
+    def extract_columns(self, ip_assets: List[Dict]) -> Dict[str, np.ndarray]:
+        return self.columns_from_compact(*self.extract_compact(ip_assets))
+    
+    def evaluate_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        technical = self.technical_model.analyze_batch(columns)
+        market = self.market_model.analyze_batch(columns)
+        financial = self.financial_model.analyze_batch(columns)
+        weighted = self.calculate_weighted_score(technical, market, financial)
+        
+        results = np.empty(len(weighted), dtype=VALUATION_DTYPE)
+        results['valuation'] = columns['base_valuation'] * weighted
+        results['confidence'] = self.confidence_scorer.calculate_confidence_batch(technical, market, financial)
+        results['technical'] = technical
+        results['market'] = market
+        results['financial'] = financial
+        results['weighted_score'] = weighted
+        return results
+    
+    def to_results(self, results: np.ndarray) -> List[ValuationResult]:
+        timestamp = datetime.now()
+        return [
+            ValuationResult(
+                valuation=valuation,
+                confidence=confidence,
+                breakdown={
+                    'technical': technical,
+                    'market': market,
+                    'financial': financial,
+                    'weighted_score': weighted_score
+                },
+                timestamp=timestamp
+            )
+            for valuation, confidence, technical, market, financial, weighted_score in results.tolist()
+        ]
+    
+    def evaluate_chunks(self, ip_assets: Iterable[Dict], chunk_size: int = 10000,
+                        workers: Optional[int] = None) -> Iterator[np.ndarray]:
+        # Yields one VALUATION_DTYPE array per chunk, in input order. With
+        # workers > 1 the parent only extracts compact chunks (numeric matrix,
+        # market keys, claim/description text); text scoring and the array
+        # math run in a process pool with a bounded number of chunks in flight.
+        assets = iter(ip_assets)
+        chunks = iter(lambda: list(islice(assets, chunk_size)), [])
+        
+        if not workers or workers <= 1:
+            for chunk in chunks:
+                yield self.evaluate_columns(self.extract_columns(chunk))
+            return
+        
+        # Workers inherit the engine by fork where available; spawned workers
+        # receive a pickled copy once through the initializer
+        context = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_valuation_worker, initargs=(self,)) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(pool.submit(_evaluate_compact_chunk, *self.extract_compact(chunk)))
+                if len(in_flight) >= workers * 2:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+    
+    def simulate_valuation_ranges(self, ip_assets: List[Dict], samples: int = 2000,
+                                  percentiles: Tuple[float, ...] = (5, 50, 95),
+                                  perturbations: Optional[Dict[str, Tuple]] = None,
+                                  seed: Optional[int] = None, max_cells: int = 4000000,
+                                  as_array: bool = False) -> Union[List[ValuationRange], np.ndarray]:
+        # Monte Carlo valuation ranges. The uncertain columns become
+        # (assets, samples) matrices and every other column is broadcast as
+        # (assets, 1), so the columnar models score all scenarios at once.
+        # Assets are processed in blocks of at most max_cells scenarios.
+        # as_array=True returns a (assets, len(percentiles)) matrix.
+        spec = dict(DEFAULT_PERTURBATIONS, **(perturbations or {}))
+        rng = np.random.default_rng(seed)
+        columns = self.extract_columns(ip_assets)
+        block = max(1, max_cells // samples)
+        
+        point = self.evaluate_columns(columns)['valuation']
+        quantiles = np.empty((len(point), len(percentiles)))
+        means = np.empty(len(point))
+        stds = np.empty(len(point))
+        
+        for start in range(0, len(point), block):
+            rows = slice(start, start + block)
+            scenario = {name: column[rows, None] for name, column in columns.items()}
+            for name, (distribution, scale, (low, high)) in spec.items():
+                values = scenario[name]
+                shape = (len(values), samples)
+                if distribution == 'normal':
+                    sampled = values + rng.normal(0.0, scale, shape)
+                elif distribution == 'uniform':
+                    sampled = values + rng.uniform(-scale, scale, shape)
+                elif distribution == 'lognormal':
+                    sampled = values * rng.lognormal(0.0, scale, shape)
+                else:
+                    raise ValueError(f"Unknown distribution for {name}: {distribution}")
+                scenario[name] = np.clip(sampled, low, high)
+            
+            weighted = self.calculate_weighted_score(
+                self.technical_model.analyze_batch(scenario),
+                self.market_model.analyze_batch(scenario),
+                self.financial_model.analyze_batch(scenario)
+            )
+            valuations = np.broadcast_to(scenario['base_valuation'] * weighted, (len(weighted), samples))
+            quantiles[rows] = np.percentile(valuations, percentiles, axis=1).T
+            means[rows] = valuations.mean(axis=1)
+            stds[rows] = valuations.std(axis=1)
+        
+        if as_array:
+            return quantiles
+        return [
+            ValuationRange(
+                valuation=valuation,
+                mean=mean,
+                std=std,
+                percentiles=dict(zip(percentiles, row))
+            )
+            for valuation, mean, std, row in zip(point.tolist(), means.tolist(), stds.tolist(), quantiles.tolist())
+        ]
+    
+    def batch_evaluate(self, ip_assets: List[Dict], as_array: bool = False, workers: Optional[int] = None,
+                       chunk_size: int = 10000) -> Union[List[ValuationResult], np.ndarray]:
+        # Columnar path: sub-scores, weighting and confidence are array
+        # expressions over the whole batch. as_array=True skips building
+        # ValuationResult objects and returns a VALUATION_DTYPE array.
+        if workers and workers > 1:
+            chunks = list(self.evaluate_chunks(ip_assets, chunk_size=chunk_size, workers=workers))
+            results = np.concatenate(chunks) if chunks else np.empty(0, dtype=VALUATION_DTYPE)
+        else:
+            results = self.evaluate_columns(self.extract_columns(ip_assets))
+        return results if as_array else self.to_results(results)
+
+    def evaluate_stream(self, input_path: str, output_path: str, chunk_size: int = 10000,
+                        workers: Optional[int] = None, report_every: float = 10.0) -> Dict[str, float]:
+        # Streams assets from JSONL or Parquet through evaluate_chunks and
+        # appends results to a JSONL or Parquet file chunk by chunk, so memory
+        # stays flat regardless of portfolio size
+        asset_ids = deque()
+        
+        def tap(assets):
+            # Ids ride alongside the assets; chunks come back in input order
+            for ip_data in assets:
+                asset_ids.append(ip_data.get('id'))
+                yield ip_data
+        
+        chunks = self.evaluate_chunks(tap(_read_assets(input_path, chunk_size)),
+                                      chunk_size=chunk_size, workers=workers)
+        start = last_report = time.perf_counter()
+        total = 0
+        
+        with _ResultWriter(output_path) as writer:
+            for results in chunks:
+                writer.write([asset_ids.popleft() for _ in range(len(results))], results)
+                total += len(results)
+                
+                now = time.perf_counter()
+                if now - last_report >= report_every:
+                    logger.info(f"Valued {total:,} assets ({total / (now - start):,.0f} assets/s)")
+                    last_report = now
+        
+        elapsed = time.perf_counter() - start
+        logger.info(f"Valued {total:,} assets in {elapsed:.1f}s")
+        return {'assets': total, 'seconds': elapsed, 'assets_per_second': total / elapsed if elapsed else 0.0}
+
+def _read_assets(path: str, batch_size: int) -> Iterator[Dict]:
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            # Parquet fills absent struct fields with nulls; drop them so the
+            # models' .get() defaults apply as they do for JSON input
+            yield from (_drop_nulls(row) for row in batch.to_pylist())
+    else:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def _drop_nulls(value):
+    if isinstance(value, dict):
+        return {key: _drop_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_drop_nulls(item) for item in value]
+    return value
+
+class _ResultWriter:
+    # JSONL by default, Parquet (via pyarrow) when the path ends in .parquet
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.handle = None
+    
+    def __enter__(self):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # Declared up front: a first batch of all-missing ids would infer a null column
+            self.schema = pa.schema(
+                [pa.field('id', pa.string(), nullable=True)] +
+                [pa.field(name, pa.from_numpy_dtype(VALUATION_DTYPE[name]), nullable=True)
+                 for name in VALUATION_DTYPE.names]
+            )
+            self.handle = pq.ParquetWriter(self.path, self.schema)
+        else:
+            self.handle = open(self.path, 'w')
+        return self
+    
+    def write(self, asset_ids: List[Optional[str]], results: np.ndarray):
+        if self.parquet:
+            import pyarrow as pa
+            table = pa.table({'id': asset_ids, **{name: results[name] for name in VALUATION_DTYPE.names}},
+                             schema=self.schema)
+            self.handle.write_table(table)
+            return
+        
+        lines = [
+            json.dumps({'id': asset_id, **dict(zip(VALUATION_DTYPE.names, row))})
+            for asset_id, row in zip(asset_ids, results.tolist())
+        ]
+        self.handle.write('\n'.join(lines) + '\n')
+    
+    def __exit__(self, *exc_info):
+        if self.handle is not None:
+            self.handle.close()
+
+_worker_engine = None
+
+def _init_valuation_worker(engine: IPValuationEngine):
+    global _worker_engine
+    _worker_engine = engine
+
+def _evaluate_compact_chunk(rows: np.ndarray, keys: np.ndarray, texts: List[Tuple[List[str], str]]) -> np.ndarray:
+    return _worker_engine.evaluate_columns(_worker_engine.columns_from_compact(rows, keys, texts))
 
 # Example usage
 if __name__ == "__main__":
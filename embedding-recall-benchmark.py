@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Recall benchmark for the embedding modes of semantic-search-simple
+Indexes a sample corpus with the hashing embedder and, when
+sentence-transformers is installed, the transformer model, then reports
+known-item recall@k, agreement with the transformer ranking and build time
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import time
+
+TOPICS = {
+    'blockchain': ['blockchain', 'token', 'ledger', 'smart contract', 'consensus', 'wallet', 'minting', 'transaction'],
+    'machine learning': ['neural network', 'training', 'inference', 'gradient', 'embedding', 'classifier', 'dataset', 'model'],
+    'imaging': ['image sensor', 'lens', 'pixel', 'exposure', 'calibration', 'optical', 'filter', 'resolution'],
+    'wireless': ['antenna', 'protocol', 'signal', 'bandwidth', 'modulation', 'channel', 'base station', 'interference'],
+    'battery': ['electrode', 'electrolyte', 'cell', 'charging', 'anode', 'cathode', 'thermal', 'capacity'],
+    'medical device': ['catheter', 'sensor', 'implant', 'patient', 'monitoring', 'stent', 'dosage', 'valve'],
+}
+
+FILLER = ['system', 'method', 'apparatus', 'device', 'configured', 'comprising', 'wherein', 'plurality', 'module', 'interface']
+
+def load_engine_module():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'semantic-search-simple.py')
+    spec = importlib.util.spec_from_file_location('semantic_search_simple', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def sample_corpus(size: int, seed: int) -> list:
+    """Synthetic patent-like assets; each query is a reworded subset of its asset"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        topic = rng.choice(list(TOPICS))
+        terms = rng.sample(TOPICS[topic], 5)
+        title = f"{terms[0].title()} {rng.choice(FILLER)} for {terms[1]} {topic}"
+        description = ' '.join(rng.choice(FILLER) + ' ' + term for term in terms[2:])
+        claims = f"A {rng.choice(FILLER)} comprising a {terms[0]} and a {terms[3]}"
+        corpus.append({
+            'id': f'asset_{i:05d}',
+            'title': title,
+            'description': description,
+            'claims': claims,
+            'query': f"{terms[1]} {terms[3]} {terms[0]} {topic}",
+        })
+    return corpus
+
+def load_corpus(path: str) -> list:
+    """JSON list or JSONL of assets; the title doubles as the query when none is given"""
+    with open(path) as f:
+        if path.endswith('.jsonl'):
+            assets = [json.loads(line) for line in f if line.strip()]
+        else:
+            assets = json.load(f)
+    for asset in assets:
+        asset.setdefault('query', asset.get('title', ''))
+    return assets
+
+def run_mode(module, mode: str, corpus: list, k: int) -> dict:
+    start = time.perf_counter()
+    engine = module.SemanticSearchEngine(embedding_mode=mode)
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for asset in corpus:
+        engine.add_ip_asset(asset)
+    index_seconds = time.perf_counter() - start
+
+    rankings = []
+    hits_at_1 = hits_at_k = 0
+    start = time.perf_counter()
+    for asset in corpus:
+        ranked = [result.asset_id for result in engine.search_similar_ip(asset['query'], k=k)]
+        rankings.append(ranked)
+        hits_at_1 += bool(ranked) and ranked[0] == asset['id']
+        hits_at_k += asset['id'] in ranked
+    query_seconds = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'startup_seconds': startup,
+        'index_seconds': index_seconds,
+        'query_ms': query_seconds / len(corpus) * 1000,
+        'recall_at_1': hits_at_1 / len(corpus),
+        f'recall_at_{k}': hits_at_k / len(corpus),
+        'rankings': rankings,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', help='JSON/JSONL assets (default: synthetic sample)')
+    parser.add_argument('--size', type=int, default=500, help='synthetic corpus size')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--skip-transformer', action='store_true')
+    parser.add_argument('--output', help='write results to this JSON file')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else sample_corpus(args.size, args.seed)
+    module = load_engine_module()
+
+    modes = ['hashing']
+    if not args.skip_transformer:
+        if importlib.util.find_spec('sentence_transformers') is None:
+            print("sentence-transformers not installed, skipping transformer mode")
+        else:
+            modes.append('transformer')
+
+    results = {mode: run_mode(module, mode, corpus, args.k) for mode in modes}
+
+    print(f"Corpus: {len(corpus)} assets, k={args.k}")
+    for result in results.values():
+        print(f"{result['mode']:>12}: startup {result['startup_seconds'] * 1000:.0f} ms, "
+              f"index {result['index_seconds']:.2f} s, query {result['query_ms']:.2f} ms, "
+              f"recall@1 {result['recall_at_1']:.3f}, recall@{args.k} {result[f'recall_at_{args.k}']:.3f}")
+
+    if 'transformer' in results:
+        # Share of the transformer's top-k that the hashing mode also returns
+        overlap = [
+            len(set(fast) & set(reference)) / max(len(reference), 1)
+            for fast, reference in zip(results['hashing']['rankings'], results['transformer']['rankings'])
+        ]
+        agreement = sum(overlap) / len(overlap)
+        print(f"Hashing vs transformer top-{args.k} overlap: {agreement:.3f}")
+        results['overlap_at_k'] = agreement
+
+    if args.output:
+        for result in results.values():
+            if isinstance(result, dict):
+                result.pop('rankings', None)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the semantic search modules
+Imports each module in a fresh interpreter, checks that heavy ML
+dependencies are not pulled in at import time, and fails when import
+cost regresses past the budget or a stored baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['semantic_search_discovery']
+
+# Modules that must only be imported once a feature actually needs them
+HEAVY_MODULES = [
+    'torch', 'transformers', 'sentence_transformers', 'cv2', 'spacy',
+    'sklearn', 'pandas', 'nltk', 'requests', 'faiss', 'scipy', 'zstandard'
+]
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+def measure_import(module: str, runs: int) -> dict:
+    """Import a module in fresh interpreters and collect timings"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    loaded = set()
+
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(root=root, module=module)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        timings.append(probe['seconds'])
+        loaded.update(probe['modules'])
+
+    return {
+        'module': module,
+        'runs': runs,
+        'median_seconds': statistics.median(timings),
+        'max_seconds': max(timings),
+        'heavy_imports': sorted(
+            name for name in HEAVY_MODULES
+            if name in loaded or any(m.startswith(name + '.') for m in loaded)
+        )
+    }
+
+def slowest_imports(module: str, limit: int = 10) -> list:
+    """Top cumulative import times reported by -X importtime"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import sys; sys.path.insert(0, {root!r}); import {module}'],
+        capture_output=True, text=True
+    ).stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        rows.append((int(cumulative), name))
+
+    return sorted(rows, reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.5,
+                        help='maximum median import time in seconds')
+    parser.add_argument('--baseline', help='JSON file with results of a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown against the baseline, as a fraction')
+    parser.add_argument('--save-baseline', help='write results to this JSON file')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = {entry['module']: entry for entry in json.load(f)}
+
+    results = []
+    failures = []
+
+    for module in args.modules:
+        result = measure_import(module, args.runs)
+        results.append(result)
+        print(f"{module}: median {result['median_seconds'] * 1000:.1f} ms "
+              f"(max {result['max_seconds'] * 1000:.1f} ms)")
+
+        if result['heavy_imports']:
+            failures.append(f"{module} imports {', '.join(result['heavy_imports'])} at load time")
+
+        if result['median_seconds'] > args.budget:
+            failures.append(f"{module} takes {result['median_seconds']:.3f}s to import "
+                            f"(budget {args.budget:.3f}s)")
+
+        previous = baseline.get(module)
+        if previous:
+            limit = previous['median_seconds'] * (1 + args.tolerance)
+            if result['median_seconds'] > limit:
+                failures.append(f"{module} import regressed from {previous['median_seconds']:.3f}s "
+                                f"to {result['median_seconds']:.3f}s")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        for module in args.modules:
+            print(f"\nSlowest imports for {module} (cumulative microseconds):")
+            for cumulative, name in slowest_imports(module):
+                print(f"  {cumulative:>9}  {name}")
+        sys.exit(1)
+
+    print("Import time within budget")
+
+if __name__ == "__main__":
+    main()
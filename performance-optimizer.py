@@ -5,6 +5,14 @@ from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import math
+import random
+import struct
+import time
+import uuid
+from typing import Optional
 import numpy as np
 
 app = FastAPI(title="IP Ingenuity Scalable API", version="2.0.0")
@@ -17,11 +25,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cached valuations: format version byte, then valuation, confidence, the
+# technical/market/financial breakdown, the seconds the computation took and
+# the unix expiry time (both used for early refresh), as little-endian doubles
+VALUATION_RECORD = struct.Struct('<B7d')
+VALUATION_RECORD_VERSION = 2
+
+# Deletes the lock only if this worker still holds it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def asset_hash(asset: dict) -> str:
+    # Canonical JSON (sorted keys, fixed separators) so every worker and every
+    # deploy derives the same key; hash(str(...)) is randomized per process
+    canonical = json.dumps(asset, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def encode_valuation(result: dict, compute_seconds: float, expires_at: float) -> bytes:
+    breakdown = result['breakdown']
+    return VALUATION_RECORD.pack(
+        VALUATION_RECORD_VERSION, result['valuation'], result['confidence'],
+        breakdown['technical'], breakdown['market'], breakdown['financial'],
+        compute_seconds, expires_at
+    )
+
+def decode_valuation(payload: bytes):
+    # Returns (result, compute_seconds, expires_at)
+    version, valuation, confidence, technical, market, financial, compute_seconds, expires_at = \
+        VALUATION_RECORD.unpack(payload)
+    if version != VALUATION_RECORD_VERSION:
+        raise ValueError(f"Unsupported valuation record version: {version}")
+    result = {
+        'valuation': valuation,
+        'confidence': confidence,
+        'breakdown': {'technical': technical, 'market': market, 'financial': financial}
+    }
+    return result, compute_seconds, expires_at
+
 class ScalableValuationEngine:
     def __init__(self):
         self.redis = None
         self.db_pool = None
         self.executor = ThreadPoolExecutor(max_workers=10)
+        self.cache_ttl = 3600
+        self.lock_lease = 10.0  # seconds a worker may hold a recompute lock
+        self.xfetch_beta = 1.0  # > 1 refreshes earlier, < 1 later
+        self.inflight = {}  # cache key -> task shared by concurrent awaiters
+        self.background = set()
     
     async def init_connections(self):
         self.redis = await aioredis.from_url("redis://localhost:6379")
@@ -32,19 +86,67 @@ class ScalableValuationEngine:
     
     async def cached_valuation(self, ip_hash: str, ip_data: dict):
         # Check cache first
-        cached = await self.redis.get(f"valuation:{ip_hash}")
+        key = f"valuation:v{VALUATION_RECORD_VERSION}:{ip_hash}"
+        cached = await self.redis.get(key)
         if cached:
-            return eval(cached)
+            result, compute_seconds, expires_at = decode_valuation(cached)
+            # XFetch: refresh early with a probability that rises as expiry
+            # nears and with how long the value takes to compute, so a hot
+            # key is renewed by one caller before it ever expires
+            early = compute_seconds * self.xfetch_beta * -math.log(1.0 - random.random())
+            if time.time() + early >= expires_at and key not in self.inflight:
+                task = self._single_flight(key, ip_data, stale=result)
+                self.background.add(task)
+                task.add_done_callback(self.background.discard)
+            return result
         
-        # Compute valuation asynchronously
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            self.executor, self._compute_valuation, ip_data
-        )
+        return await asyncio.shield(self._single_flight(key, ip_data))
+    
+    def _single_flight(self, key: str, ip_data: dict, stale: Optional[dict] = None) -> asyncio.Task:
+        # One task per key in this process; concurrent callers and duplicate
+        # assets in a batch await the same computation
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(key, ip_data, stale))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return task
+    
+    async def _fill(self, key: str, ip_data: dict, stale: Optional[dict] = None):
+        # Across workers, a short Redis lease elects one computer per key;
+        # the others poll the cache until the value lands or the lease lapses.
+        # An early refresh carries the still-valid value in `stale` and
+        # returns it if another worker is already refreshing.
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(lock_key, token, nx=True, px=int(self.lock_lease * 1000))
+        
+        if not acquired:
+            if stale is not None:
+                return stale
+            deadline = time.monotonic() + self.lock_lease
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                cached = await self.redis.get(key)
+                if cached:
+                    return decode_valuation(cached)[0]
         
-        # Cache result for 1 hour
-        await self.redis.setex(f"valuation:{ip_hash}", 3600, str(result))
-        return result
+        try:
+            # Compute valuation asynchronously
+            loop = asyncio.get_event_loop()
+            start = time.monotonic()
+            result = await loop.run_in_executor(
+                self.executor, self._compute_valuation, ip_data
+            )
+            compute_seconds = time.monotonic() - start
+            
+            # Cache result for 1 hour
+            await self.redis.setex(key, self.cache_ttl,
+                                   encode_valuation(result, compute_seconds, time.time() + self.cache_ttl))
+            return result
+        finally:
+            if acquired:
+                await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
     
     def _compute_valuation(self, ip_data):
         # Optimized valuation computation
@@ -84,8 +186,7 @@ async def startup():
 async def batch_valuation(assets: list):
     tasks = []
     for asset in assets:
-        ip_hash = hash(str(asset))
-        tasks.append(engine.cached_valuation(str(ip_hash), asset))
+        tasks.append(engine.cached_valuation(asset_hash(asset), asset))
     
     results = await asyncio.gather(*tasks)
     return {"results": results, "count": len(results)}
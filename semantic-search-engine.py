@@ -5,9 +5,17 @@ from typing import List, Dict, Optional, Tuple
 import cv2
 import torch
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import hashlib
+import heapq
 import json
+import os
+import pickle
 import re
 
+from trending_tracker import TrendingTracker
+
 @dataclass
 class SearchResult:
     asset_id: str
@@ -21,18 +29,125 @@ class VisualAnalysisResult:
     patterns: List[Dict]
     similar_assets: List[SearchResult]
 
+class TermMatcher:
+    # Word-level Aho-Corasick automaton over a dictionary of single- and
+    # multi-word terms. Built once; matching is one pass over the tokens.
+    TOKEN_PATTERN = re.compile(r'\b\w+\b')
+    
+    def __init__(self, terms):
+        terms = list(terms)
+        self.source = self.fingerprint(terms)
+        self.terms = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        
+        for term in terms:
+            tokens = self.tokenize(term)
+            if tokens:
+                self._insert(tokens, ' '.join(tokens))
+        self._build_failure_links()
+    
+    @staticmethod
+    def fingerprint(terms: List[str]) -> str:
+        # Identifies the term list a saved automaton was compiled from
+        return hashlib.sha256('\n'.join(terms).encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        return cls.TOKEN_PATTERN.findall(text.lower())
+    
+    def _insert(self, tokens: List[str], term: str):
+        state = 0
+        for token in tokens:
+            next_state = self.goto[state].get(token)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][token] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            state = next_state
+        if not self.output[state]:
+            self.output[state] = (len(self.terms),)
+            self.terms.append(term)
+    
+    def _build_failure_links(self):
+        # Breadth-first, so every failure target is finished before it is used
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(token, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+    
+    def match(self, text: str) -> List[str]:
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        state = 0
+        
+        for token in self.tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found.update(output[state])
+        
+        return [self.terms[i] for i in found]
+    
+    @staticmethod
+    def read_terms(path: str) -> List[str]:
+        # One term per line; blank lines and '#' comments are ignored
+        with open(path, encoding='utf-8') as f:
+            terms = [line.strip() for line in f]
+        return [term for term in terms if term and not term.startswith('#')]
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'TermMatcher':
+        return cls(cls.read_terms(path))
+    
+    def save(self, path: str):
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump((self.source, self.terms, self.goto, self.fail, self.output), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'TermMatcher':
+        matcher = cls.__new__(cls)
+        with open(path, 'rb') as f:
+            matcher.source, matcher.terms, matcher.goto, matcher.fail, matcher.output = pickle.load(f)
+        return matcher
+
 class NLPProcessor:
-    def __init__(self):
+    def __init__(self, terms_path: Optional[str] = None, matcher_path: Optional[str] = None):
         self.technical_terms = {
             'system', 'method', 'apparatus', 'device', 'process', 'algorithm',
             'network', 'protocol', 'interface', 'module', 'component', 'framework'
         }
+        
+        # A precompiled automaton loads fastest, but only while it still matches
+        # terms_path; a stale one is recompiled and saved again. The built-in
+        # default is never written to matcher_path.
+        terms = TermMatcher.read_terms(terms_path) if terms_path else None
+        matcher = TermMatcher.load(matcher_path) if matcher_path and os.path.exists(matcher_path) else None
+        if matcher is not None and terms is not None and matcher.source != TermMatcher.fingerprint(terms):
+            matcher = None
+        if matcher is None:
+            matcher = TermMatcher(terms if terms is not None else sorted(self.technical_terms))
+            if matcher_path and terms is not None:
+                matcher.save(matcher_path)
+        self.term_matcher = matcher
+        self.technical_terms = set(self.term_matcher.terms)
     
     def extract_technical_concepts(self, text: str) -> List[str]:
         # Extract technical concepts from patent text
-        words = re.findall(r'\b\w+\b', text.lower())
-        technical_concepts = [word for word in words if word in self.technical_terms]
-        return list(set(technical_concepts))
+        return self.term_matcher.match(text)
     
     def preprocess_text(self, text: str) -> str:
         # Clean and normalize text for embedding
@@ -41,16 +156,30 @@ class NLPProcessor:
         return text.strip().lower()
 
 class VectorDatabase:
+    LOAD_BLOCK_ROWS = 65536
+    
     def __init__(self, dimension: int = 384):
         self.dimension = dimension
         self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
         self.metadata_store = {}
+        self.references = {}  # vector id -> metadata of other assets sharing that vector
         self.id_counter = 0
+        self.mapped = False  # index is a read-only memory map of a saved file
+    
+    def add_reference(self, idx: int, metadata: Dict):
+        # Attach another asset to an existing vector instead of storing a copy
+        self.references.setdefault(idx, []).append(metadata)
+    
+    def metadata_for(self, idx: int) -> List[Dict]:
+        if idx not in self.metadata_store:
+            return []
+        return [self.metadata_store[idx]] + self.references.get(idx, [])
     
     def add_embeddings(self, embeddings: np.ndarray, metadata: List[Dict]):
         # Normalize embeddings for cosine similarity
         faiss.normalize_L2(embeddings)
         
+        self._materialize()
         start_id = self.id_counter
         self.index.add(embeddings)
         
@@ -59,6 +188,52 @@ class VectorDatabase:
         
         self.id_counter += len(embeddings)
     
+    def _materialize(self):
+        # A memory-mapped index is a read-only view of the file; copy it into
+        # RAM block by block before the first write
+        if not self.mapped:
+            return
+        index = faiss.IndexFlatIP(self.dimension)
+        for start in range(0, self.index.ntotal, self.LOAD_BLOCK_ROWS):
+            index.add(self.index.reconstruct_n(start, min(self.LOAD_BLOCK_ROWS, self.index.ntotal - start)))
+        self.index = index
+        self.mapped = False
+    
+    def save(self, path: str):
+        # Vectors in FAISS's own index format (already L2-normalized), counters
+        # and metadata in a pickle; each file is renamed into place once written
+        os.makedirs(path, exist_ok=True)
+        index_file = os.path.join(path, 'vectors.faiss')
+        state_file = os.path.join(path, 'state.pkl')
+        
+        faiss.write_index(self.index, index_file + '.tmp')
+        with open(state_file + '.tmp', 'wb') as f:
+            pickle.dump({
+                'dimension': self.dimension,
+                'id_counter': self.id_counter,
+                'metadata_store': self.metadata_store,
+                'references': self.references,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        os.replace(index_file + '.tmp', index_file)
+        os.replace(state_file + '.tmp', state_file)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'VectorDatabase':
+        # With mmap the vectors stay in the page cache and are searched in
+        # place; FAISS builds without IO_FLAG_MMAP_IFC read them into RAM
+        with open(os.path.join(path, 'state.pkl'), 'rb') as f:
+            state = pickle.load(f)
+        
+        database = cls(dimension=state['dimension'])
+        flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', 0) if mmap else 0
+        database.index = faiss.read_index(os.path.join(path, 'vectors.faiss'), flags)
+        database.mapped = bool(flags)
+        database.id_counter = state['id_counter']
+        database.metadata_store = state['metadata_store']
+        database.references = state.get('references', {})
+        return database
+    
     def similarity_search(self, query_embedding: np.ndarray, k: int = 10) -> List[SearchResult]:
         # Normalize query embedding
         query_embedding = query_embedding.reshape(1, -1)
@@ -68,8 +243,7 @@ class VectorDatabase:
         
         results = []
         for score, idx in zip(scores[0], indices[0]):
-            if idx in self.metadata_store:
-                metadata = self.metadata_store[idx]
+            for metadata in self.metadata_for(idx):
                 results.append(SearchResult(
                     asset_id=metadata.get('id', str(idx)),
                     similarity_score=float(score),
@@ -78,12 +252,22 @@ class VectorDatabase:
                 ))
         
         return results
+    
+    def search_batch(self, query_embeddings: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        # One multi-row FAISS search; returns raw (scores, indices) arrays
+        queries = np.array(query_embeddings, dtype=np.float32, ndmin=2)
+        faiss.normalize_L2(queries)
+        return self.index.search(queries, k)
 
 class FeatureExtractor:
-    def __init__(self):
-        # Simplified feature extraction for technical drawings
-        self.edge_detector = cv2.Canny
-        self.contour_detector = cv2.findContours
+    # Descriptor layout: [area, perimeter, circularity] for the 10 largest shapes
+    MAX_COMPONENTS = 10
+    
+    def __init__(self, working_size: int = 1024, min_component_area: int = 16):
+        # Drawing sheets are downscaled so their longest side is at most
+        # working_size, which bounds the per-image cost regardless of scan size
+        self.working_size = working_size
+        self.min_component_area = min_component_area
     
     def extract(self, image_data: np.ndarray) -> np.ndarray:
         # Convert to grayscale if needed
@@ -92,29 +276,48 @@ class FeatureExtractor:
         else:
             gray = image_data
         
-        # Extract edge features
-        edges = self.edge_detector(gray, 50, 150)
-        
-        # Extract contour features
-        contours, _ = self.contour_detector(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Create feature vector from contours
-        features = []
-        for contour in contours[:10]:  # Limit to top 10 contours
-            area = cv2.contourArea(contour)
-            perimeter = cv2.arcLength(contour, True)
-            if perimeter > 0:
-                circularity = 4 * np.pi * area / (perimeter * perimeter)
-                features.extend([area, perimeter, circularity])
-        
-        # Pad or truncate to fixed size
-        target_size = 30  # 10 contours * 3 features
-        if len(features) < target_size:
-            features.extend([0.0] * (target_size - len(features)))
-        else:
-            features = features[:target_size]
+        # Downscale large scans to the working resolution
+        height, width = gray.shape[:2]
+        scale = self.working_size / max(height, width)
+        if scale < 1.0:
+            size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+            height, width = gray.shape[:2]
+        
+        # Strokes are dark on light paper; Otsu picks the ink threshold
+        _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        
+        # Rank shapes by ink area using connected-component statistics
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        candidates = np.flatnonzero(areas >= self.min_component_area)
+        if len(candidates) > self.MAX_COMPONENTS:
+            candidates = candidates[np.argpartition(-areas[candidates], self.MAX_COMPONENTS - 1)[:self.MAX_COMPONENTS]]
+        largest = candidates[np.argsort(-areas[candidates], kind='stable')]
         
-        return np.array(features, dtype=np.float32)
+        # Trace outlines only inside the bounding boxes of the selected shapes,
+        # normalizing sizes by the sheet so the descriptor is scale invariant
+        image_area = float(height * width)
+        image_perimeter = 2.0 * (height + width)
+        features = np.zeros(self.MAX_COMPONENTS * 3, dtype=np.float32)
+        
+        for slot, component in enumerate(largest):
+            label = component + 1
+            x, y, w, h = stats[label, :4]
+            mask = (labels[y:y + h, x:x + w] == label).astype(np.uint8)
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            
+            area = sum(cv2.contourArea(contour) for contour in contours)
+            perimeter = sum(cv2.arcLength(contour, True) for contour in contours)
+            circularity = min(1.0, 4 * np.pi * area / (perimeter * perimeter)) if perimeter > 0 else 0.0
+            
+            features[slot * 3:slot * 3 + 3] = (area / image_area, perimeter / image_perimeter, circularity)
+        
+        return features
+    
+    def extract_batch(self, images: List[np.ndarray]) -> np.ndarray:
+        # Stack descriptors of several images into one (n, 30) query matrix
+        return np.stack([self.extract(image) for image in images])
 
 class PatternMatcher:
     def __init__(self):
@@ -129,7 +332,7 @@ class PatternMatcher:
         
         # Simplified pattern identification based on feature analysis
         if len(features) >= 9:  # At least 3 contours
-            avg_area = np.mean(features[::3])  # Every 3rd element is area
+            avg_area = np.mean(features[::3])  # Every 3rd element is area (fraction of the sheet)
             avg_circularity = np.mean(features[2::3])  # Every 3rd element starting from 2 is circularity
             
             if avg_circularity > 0.7:
@@ -138,20 +341,77 @@ class PatternMatcher:
                     'confidence': avg_circularity,
                     'characteristics': {'component_density': avg_area}
                 })
-            elif avg_area > 1000:
+            elif avg_area > 0.01:
                 patterns.append({
                     'type': 'mechanical',
-                    'confidence': min(1.0, avg_area / 5000),
+                    'confidence': min(1.0, avg_area / 0.05),
                     'characteristics': {'complexity': avg_area}
                 })
         
         return patterns
 
+class PerceptualHashIndex:
+    # 64-bit dHash split into 8 bands of 8 bits. Two hashes within Hamming
+    # distance 7 must agree exactly on at least one band, so candidates come
+    # from band lookups instead of a scan over every stored hash.
+    BANDS = 8
+    
+    def __init__(self, max_distance: int = 6):
+        if not 0 <= max_distance < self.BANDS:
+            raise ValueError(f"max_distance must be between 0 and {self.BANDS - 1}")
+        self.max_distance = max_distance
+        self.band_tables = [{} for _ in range(self.BANDS)]
+        self.hashes = {}  # hash -> vector id
+    
+    @staticmethod
+    def dhash(image_data: np.ndarray) -> int:
+        # Horizontal gradient signs of a 9x8 thumbnail
+        if len(image_data.shape) == 3:
+            image_data = cv2.cvtColor(image_data, cv2.COLOR_BGR2GRAY)
+        thumbnail = cv2.resize(image_data, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+        bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).ravel()
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+    
+    def find(self, image_hash: int) -> Optional[int]:
+        if image_hash in self.hashes:
+            return self.hashes[image_hash]
+        
+        best_id, best_distance = None, self.max_distance + 1
+        for band, table in enumerate(self.band_tables):
+            for candidate in table.get((image_hash >> (8 * band)) & 0xFF, ()):
+                distance = bin(candidate ^ image_hash).count('1')
+                if distance < best_distance:
+                    best_id, best_distance = self.hashes[candidate], distance
+        return best_id
+    
+    def to_state(self) -> Dict:
+        # Plain arrays; band tables are rebuilt on load
+        return {
+            'max_distance': self.max_distance,
+            'hashes': np.fromiter(self.hashes.keys(), dtype=np.uint64, count=len(self.hashes)),
+            'vector_ids': np.fromiter(self.hashes.values(), dtype=np.int64, count=len(self.hashes)),
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict) -> 'PerceptualHashIndex':
+        index = cls(max_distance=state['max_distance'])
+        for image_hash, vector_id in zip(state['hashes'].tolist(), state['vector_ids'].tolist()):
+            index.add(image_hash, vector_id)
+        return index
+    
+    def add(self, image_hash: int, vector_id: int):
+        if image_hash in self.hashes:
+            return
+        self.hashes[image_hash] = vector_id
+        for band, table in enumerate(self.band_tables):
+            table.setdefault((image_hash >> (8 * band)) & 0xFF, []).append(image_hash)
+
 class VisualRecognitionEngine:
-    def __init__(self):
+    def __init__(self, dedup_distance: int = 6):
         self.feature_extractor = FeatureExtractor()
         self.pattern_matcher = PatternMatcher()
         self.visual_index = VectorDatabase(dimension=30)  # Match feature vector size
+        self.hash_index = PerceptualHashIndex(max_distance=dedup_distance)
     
     def analyze_technical_drawing(self, image_data: np.ndarray) -> VisualAnalysisResult:
         features = self.feature_extractor.extract(image_data)
@@ -163,26 +423,51 @@ class VisualRecognitionEngine:
     def find_similar_visual_assets(self, features: np.ndarray) -> List[SearchResult]:
         return self.visual_index.similarity_search(features, k=5)
     
+    def search_images(self, images: List[np.ndarray], k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        # Extract all query drawings together and search them in one call
+        features = self.feature_extractor.extract_batch(images)
+        return self.visual_index.search_batch(features, k=k)
+    
+    def reference_duplicate(self, image_hash: int, metadata: Dict) -> bool:
+        # Near-identical drawings (reused figure sheets) only get a metadata
+        # reference to the existing vector. Returns False when the drawing is
+        # new and its features still have to be extracted and stored.
+        existing_id = self.hash_index.find(image_hash)
+        if existing_id is None:
+            return False
+        self.visual_index.add_reference(existing_id, metadata)
+        return True
+    
     def add_visual_asset(self, image_data: np.ndarray, metadata: Dict):
+        image_hash = self.hash_index.dhash(image_data)
+        if self.reference_duplicate(image_hash, metadata):
+            return
         features = self.feature_extractor.extract(image_data)
-        self.visual_index.add_embeddings(features.reshape(1, -1), [metadata])
+        self.add_visual_features(features.reshape(1, -1), [metadata], [image_hash])
+    
+    def add_visual_features(self, features: np.ndarray, metadata: List[Dict], hashes: Optional[List[int]] = None):
+        # Block insert of features that were extracted ahead of time. Hashes
+        # are registered only once their vectors are stored, so a failed
+        # extraction never leaves a hash pointing at a missing vector.
+        start_id = self.visual_index.id_counter
+        self.visual_index.add_embeddings(np.ascontiguousarray(features, dtype=np.float32), metadata)
+        for offset, image_hash in enumerate(hashes or ()):
+            self.hash_index.add(image_hash, start_id + offset)
 
 class SemanticSearchEngine:
     def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
         self.nlp_processor = NLPProcessor()
         self.embedding_model = SentenceTransformer(model_name)
         self.vector_database = VectorDatabase(dimension=384)  # MiniLM embedding size
+        self.trending = TrendingTracker()
         self.visual_recognition = VisualRecognitionEngine()
+        self.failed_drawings = []  # drawings skipped by the last add_ip_assets call
     
-    def add_ip_asset(self, asset_data: Dict):
+    def _prepare_asset(self, asset_data: Dict) -> Tuple[str, Dict]:
         # Process text content
         text_content = f"{asset_data.get('title', '')} {asset_data.get('description', '')} {asset_data.get('claims', '')}"
         processed_text = self.nlp_processor.preprocess_text(text_content)
         
-        # Generate text embedding
-        text_embedding = self.embedding_model.encode([processed_text])
-        
-        # Add to vector database
         metadata = {
             'id': asset_data.get('id'),
             'type': asset_data.get('type', 'patent'),
@@ -191,33 +476,160 @@ class SemanticSearchEngine:
             'creation_date': asset_data.get('creation_date'),
             'technical_concepts': self.nlp_processor.extract_technical_concepts(text_content)
         }
+        return processed_text, metadata
+    
+    def add_ip_asset(self, asset_data: Dict):
+        processed_text, metadata = self._prepare_asset(asset_data)
         
+        # Generate text embedding
+        text_embedding = self.embedding_model.encode([processed_text])
+        
+        # Add to vector database
         self.vector_database.add_embeddings(text_embedding, [metadata])
+        self.trending.add(metadata['technical_concepts'], metadata['creation_date'])
         
         # Process visual content if available
         if 'images' in asset_data:
             for img_data in asset_data['images']:
                 self.visual_recognition.add_visual_asset(img_data, metadata)
     
+    def add_ip_assets(self, assets: List[Dict], batch_size: int = 64, max_workers: Optional[int] = None) -> int:
+        # Staged bulk ingestion with a two-chunk window: the drawings of chunk
+        # N are submitted to a worker pool (OpenCV releases the GIL), then
+        # chunk N's text is encoded and inserted, and only then are chunk
+        # N-1's features collected and block-inserted. Extraction of one chunk
+        # therefore overlaps the text work and visual insert of the next, and
+        # at most two chunks of futures are held. Drawings that fail to hash
+        # or extract are skipped and listed in failed_drawings as
+        # (asset id, image position, error).
+        self.failed_drawings = []
+        in_flight = []  # (jobs, pending hash index) of the chunk awaiting its visual insert
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for start in range(0, len(assets), batch_size):
+                chunk = assets[start:start + batch_size]
+                prepared = []
+                # [future, metadata, position, hash, duplicates as (metadata, position)]
+                jobs = []
+                pending = PerceptualHashIndex(max_distance=self.visual_recognition.hash_index.max_distance)
+                
+                for asset_data in chunk:
+                    processed_text, metadata = self._prepare_asset(asset_data)
+                    prepared.append((processed_text, metadata))
+                    for position, img_data in enumerate(asset_data.get('images', [])):
+                        try:
+                            image_hash = PerceptualHashIndex.dhash(img_data)
+                        except Exception as e:
+                            self.failed_drawings.append((metadata['id'], position, repr(e)))
+                            continue
+                        if self.visual_recognition.reference_duplicate(image_hash, metadata):
+                            continue
+                        # Drawings of chunks not inserted yet are not in the hash index
+                        duplicate_of = None
+                        for earlier_jobs, earlier_pending in in_flight + [(jobs, pending)]:
+                            slot = earlier_pending.find(image_hash)
+                            if slot is not None:
+                                duplicate_of = earlier_jobs[slot]
+                                break
+                        if duplicate_of is not None:
+                            duplicate_of[4].append((metadata, position))
+                            continue
+                        pending.add(image_hash, len(jobs))
+                        future = pool.submit(self.visual_recognition.feature_extractor.extract, img_data)
+                        jobs.append([future, metadata, position, image_hash, []])
+                
+                text_embeddings = self.embedding_model.encode(
+                    [text for text, _ in prepared], batch_size=batch_size
+                )
+                self.vector_database.add_embeddings(
+                    np.ascontiguousarray(text_embeddings, dtype=np.float32),
+                    [metadata for _, metadata in prepared]
+                )
+                for _, metadata in prepared:
+                    self.trending.add(metadata['technical_concepts'], metadata['creation_date'])
+                
+                if in_flight:
+                    self._insert_drawings(in_flight.pop()[0])
+                in_flight.append((jobs, pending))
+            
+            if in_flight:
+                self._insert_drawings(in_flight.pop()[0])
+        
+        return len(assets)
+    
+    def _insert_drawings(self, jobs: List[list]):
+        # Collect one chunk's extracted features and block-insert them
+        extracted = []
+        for future, metadata, position, image_hash, duplicates in jobs:
+            try:
+                extracted.append((future.result(), metadata, image_hash, duplicates))
+            except Exception as e:
+                for failed, failed_position in [(metadata, position)] + duplicates:
+                    self.failed_drawings.append((failed['id'], failed_position, repr(e)))
+        if not extracted:
+            return
+        
+        # Hashes are registered by add_visual_features only after the
+        # vectors are stored, so a failed extraction leaves no stale ids
+        start_id = self.visual_recognition.visual_index.id_counter
+        self.visual_recognition.add_visual_features(
+            np.stack([features for features, _, _, _ in extracted]),
+            [metadata for _, metadata, _, _ in extracted],
+            [image_hash for _, _, image_hash, _ in extracted]
+        )
+        for offset, (_, _, _, duplicates) in enumerate(extracted):
+            for metadata, _ in duplicates:
+                self.visual_recognition.visual_index.add_reference(start_id + offset, metadata)
+    
     def search_similar_ip(self, query_text: str, query_images: Optional[List[np.ndarray]] = None, k: int = 10) -> List[SearchResult]:
         # Text-based semantic search
         processed_query = self.nlp_processor.preprocess_text(query_text)
         text_embeddings = self.embedding_model.encode([processed_query])
-        text_results = self.vector_database.similarity_search(text_embeddings[0], k=k)
-        
-        # Visual pattern recognition (if images provided)
-        if query_images:
-            visual_results = []
-            for img in query_images:
-                visual_analysis = self.visual_recognition.analyze_technical_drawing(img)
-                visual_results.extend(visual_analysis.similar_assets)
-            
-            # Merge text and visual results
-            combined_results = self.merge_results(text_results, visual_results)
-        else:
-            combined_results = text_results
         
-        return self.rank_and_filter_results(combined_results, k)
+        if not query_images:
+            text_results = self.vector_database.similarity_search(text_embeddings[0], k=k)
+            return self.rank_and_filter_results(text_results, k)
+        
+        # Visual pattern recognition: all query images in one batched search
+        text_scores, text_indices = self.vector_database.search_batch(text_embeddings[:1], k=k)
+        visual_scores, visual_indices = self.visual_recognition.search_images(query_images, k=5)
+        
+        return self.merge_ranked_hits(text_scores, text_indices, visual_scores, visual_indices, k)
+    
+    def merge_ranked_hits(self, text_scores: np.ndarray, text_indices: np.ndarray,
+                          visual_scores: np.ndarray, visual_indices: np.ndarray,
+                          k: int) -> List[SearchResult]:
+        # Same weighting as merge_results, but accumulated as plain floats per
+        # asset id; SearchResult objects are only built for the final top k
+        text_store = self.vector_database.metadata_store
+        visual_db = self.visual_recognition.visual_index
+        scores = {}
+        sources = {}
+        
+        for score, idx in zip(text_scores[0], text_indices[0]):
+            metadata = text_store.get(idx)
+            if metadata is not None:
+                asset_id = metadata.get('id', str(idx))
+                scores[asset_id] = float(score) * 0.7  # Text weight
+                sources[asset_id] = metadata
+        
+        for row_scores, row_indices in zip(visual_scores, visual_indices):
+            for score, idx in zip(row_scores, row_indices):
+                for metadata in visual_db.metadata_for(idx):
+                    asset_id = metadata.get('id', str(idx))
+                    scores[asset_id] = scores.get(asset_id, 0.0) + float(score) * 0.3  # Visual weight
+                    sources.setdefault(asset_id, metadata)
+        
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [
+            SearchResult(
+                asset_id=asset_id,
+                similarity_score=score,
+                asset_type=sources[asset_id].get('type', 'unknown'),
+                metadata=sources[asset_id]
+            )
+            for asset_id, score in top
+        ]
     
     def merge_results(self, text_results: List[SearchResult], visual_results: List[SearchResult]) -> List[SearchResult]:
         # Combine and deduplicate results
@@ -264,17 +676,29 @@ class SemanticSearchEngine:
         query_text = " ".join(concepts)
         return self.search_similar_ip(query_text, k=k)
     
-    def get_trending_technologies(self) -> Dict[str, int]:
-        # Analyze trending technologies from stored assets
-        concept_counts = {}
-        
-        for metadata in self.vector_database.metadata_store.values():
-            concepts = metadata.get('technical_concepts', [])
-            for concept in concepts:
-                concept_counts[concept] = concept_counts.get(concept, 0) + 1
-        
-        # Sort by frequency
-        return dict(sorted(concept_counts.items(), key=lambda x: x[1], reverse=True)[:20])
+    def get_trending_technologies(self, window_days: Optional[int] = None) -> Dict[str, int]:
+        # Top concepts overall, or among assets created in the last 7/30/90 days
+        return self.trending.top(window_days)
+    
+    def save(self, path: str):
+        self.vector_database.save(os.path.join(path, 'text'))
+        self.visual_recognition.visual_index.save(os.path.join(path, 'visual'))
+        # Plain dicts and arrays only, so the file loads whatever module name
+        # this script was imported under
+        with open(os.path.join(path, 'engine_state.pkl'), 'wb') as f:
+            pickle.dump({
+                'trending': self.trending.to_state(),
+                'hash_index': self.visual_recognition.hash_index.to_state()
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def load(self, path: str, mmap: bool = True):
+        # Restore a saved catalogue instead of re-embedding every asset
+        with open(os.path.join(path, 'engine_state.pkl'), 'rb') as f:
+            state = pickle.load(f)
+        self.vector_database = VectorDatabase.load(os.path.join(path, 'text'), mmap=mmap)
+        self.visual_recognition.visual_index = VectorDatabase.load(os.path.join(path, 'visual'), mmap=mmap)
+        self.visual_recognition.hash_index = PerceptualHashIndex.from_state(state['hash_index'])
+        self.trending = TrendingTracker.from_state(state['trending'])
 
 # Example usage
 if __name__ == "__main__":
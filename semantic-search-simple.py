@@ -1,10 +1,14 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 import json
+import os
+import pickle
 import re
+import zlib
+
+from trending_tracker import TrendingTracker
 
 @dataclass
 class SearchResult:
@@ -31,15 +35,19 @@ class NLPProcessor:
         return text.strip().lower()
 
 class VectorDatabase:
+    LOAD_BLOCK_ROWS = 65536
+    
     def __init__(self, dimension: int = 384):
         self.dimension = dimension
         self.index = faiss.IndexFlatIP(dimension)
         self.metadata_store = {}
         self.id_counter = 0
+        self.mapped = False  # index is a read-only memory map of a saved file
     
     def add_embeddings(self, embeddings: np.ndarray, metadata: List[Dict]):
         faiss.normalize_L2(embeddings)
         
+        self._materialize()
         start_id = self.id_counter
         self.index.add(embeddings)
         
@@ -48,6 +56,50 @@ class VectorDatabase:
         
         self.id_counter += len(embeddings)
     
+    def _materialize(self):
+        # A memory-mapped index is a read-only view of the file; copy it into
+        # RAM block by block before the first write
+        if not self.mapped:
+            return
+        index = faiss.IndexFlatIP(self.dimension)
+        for start in range(0, self.index.ntotal, self.LOAD_BLOCK_ROWS):
+            index.add(self.index.reconstruct_n(start, min(self.LOAD_BLOCK_ROWS, self.index.ntotal - start)))
+        self.index = index
+        self.mapped = False
+    
+    def save(self, path: str):
+        # Vectors in FAISS's own index format (already L2-normalized), counters
+        # and metadata in a pickle; each file is renamed into place once written
+        os.makedirs(path, exist_ok=True)
+        index_file = os.path.join(path, 'vectors.faiss')
+        state_file = os.path.join(path, 'state.pkl')
+        
+        faiss.write_index(self.index, index_file + '.tmp')
+        with open(state_file + '.tmp', 'wb') as f:
+            pickle.dump({
+                'dimension': self.dimension,
+                'id_counter': self.id_counter,
+                'metadata_store': self.metadata_store,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        os.replace(index_file + '.tmp', index_file)
+        os.replace(state_file + '.tmp', state_file)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'VectorDatabase':
+        # With mmap the vectors stay in the page cache and are searched in
+        # place; FAISS builds without IO_FLAG_MMAP_IFC read them into RAM
+        with open(os.path.join(path, 'state.pkl'), 'rb') as f:
+            state = pickle.load(f)
+        
+        database = cls(dimension=state['dimension'])
+        flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', 0) if mmap else 0
+        database.index = faiss.read_index(os.path.join(path, 'vectors.faiss'), flags)
+        database.mapped = bool(flags)
+        database.id_counter = state['id_counter']
+        database.metadata_store = state['metadata_store']
+        return database
+    
     def similarity_search(self, query_embedding: np.ndarray, k: int = 10) -> List[SearchResult]:
         query_embedding = query_embedding.reshape(1, -1)
         faiss.normalize_L2(query_embedding)
@@ -67,11 +119,54 @@ class VectorDatabase:
         
         return results
 
+class HashingEmbedder:
+    # Torch-free encoder: signed feature hashing of words and word bigrams,
+    # followed by a fixed seeded random projection down to `dimension`.
+    # Same encode() shape contract as SentenceTransformer, no model download.
+    def __init__(self, dimension: int = 384, n_features: int = 4096, seed: int = 42):
+        self.dimension = dimension
+        self.n_features = n_features
+        rng = np.random.default_rng(seed)
+        self.projection = (rng.standard_normal((n_features, dimension)) / np.sqrt(dimension)).astype(np.float32)
+    
+    def _hashed_features(self, text: str) -> Dict[int, float]:
+        words = re.findall(r'\b\w+\b', text.lower())
+        tokens = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        counts = {}
+        for token in tokens:
+            # crc32 rather than hash(): stable across processes and restarts
+            h = zlib.crc32(token.encode('utf-8'))
+            bucket = h % self.n_features
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        return counts
+    
+    def encode(self, sentences, batch_size: int = 64, **kwargs) -> np.ndarray:
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        features = np.zeros((len(sentences), self.n_features), dtype=np.float32)
+        for row, text in enumerate(sentences):
+            counts = self._hashed_features(text)
+            if counts:
+                buckets = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                features[row, buckets] = np.sign(values) * np.log1p(np.abs(values))
+        return features @ self.projection
+
 class SemanticSearchEngine:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', embedding_mode: str = 'transformer'):
         self.nlp_processor = NLPProcessor()
-        self.embedding_model = SentenceTransformer(model_name)
+        self.embedding_mode = embedding_mode
+        if embedding_mode == 'hashing':
+            self.embedding_model = HashingEmbedder(dimension=384)
+        elif embedding_mode == 'transformer':
+            # Imported here so the hashing mode never loads torch
+            from sentence_transformers import SentenceTransformer
+            self.embedding_model = SentenceTransformer(model_name)
+        else:
+            raise ValueError(f"Unknown embedding_mode: {embedding_mode}")
         self.vector_database = VectorDatabase(dimension=384)
+        self.trending = TrendingTracker()
     
     def add_ip_asset(self, asset_data: Dict):
         text_content = f"{asset_data.get('title', '')} {asset_data.get('description', '')} {asset_data.get('claims', '')}"
@@ -89,21 +184,31 @@ class SemanticSearchEngine:
         }
         
         self.vector_database.add_embeddings(text_embedding, [metadata])
+        self.trending.add(metadata['technical_concepts'], metadata['creation_date'])
     
     def search_similar_ip(self, query_text: str, k: int = 10) -> List[SearchResult]:
         processed_query = self.nlp_processor.preprocess_text(query_text)
         text_embeddings = self.embedding_model.encode([processed_query])
         return self.vector_database.similarity_search(text_embeddings[0], k=k)
     
-    def get_trending_technologies(self) -> Dict[str, int]:
-        concept_counts = {}
-        
-        for metadata in self.vector_database.metadata_store.values():
-            concepts = metadata.get('technical_concepts', [])
-            for concept in concepts:
-                concept_counts[concept] = concept_counts.get(concept, 0) + 1
-        
-        return dict(sorted(concept_counts.items(), key=lambda x: x[1], reverse=True)[:20])
+    def get_trending_technologies(self, window_days: Optional[int] = None) -> Dict[str, int]:
+        return self.trending.top(window_days)
+    
+    def save(self, path: str):
+        self.vector_database.save(os.path.join(path, 'text'))
+        with open(os.path.join(path, 'engine_state.pkl'), 'wb') as f:
+            pickle.dump({'embedding_mode': self.embedding_mode, 'trending': self.trending.to_state()}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def load(self, path: str, mmap: bool = True):
+        # Restore a saved catalogue instead of re-embedding every asset
+        with open(os.path.join(path, 'engine_state.pkl'), 'rb') as f:
+            state = pickle.load(f)
+        if state['embedding_mode'] != self.embedding_mode:
+            raise ValueError(f"Index was built with {state['embedding_mode']} embeddings, "
+                             f"engine uses {self.embedding_mode}")
+        self.vector_database = VectorDatabase.load(os.path.join(path, 'text'), mmap=mmap)
+        self.trending = TrendingTracker.from_state(state['trending'])
 
 if __name__ == "__main__":
     search_engine = SemanticSearchEngine()
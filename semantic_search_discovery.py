@@ -5,41 +5,111 @@ Based on patent specifications with FAISS indexing and transformer embeddings
 """
 
 import numpy as np
-import pandas as pd
-import faiss
-import torch
-from sentence_transformers import SentenceTransformer
-from transformers import AutoTokenizer, AutoModel
-import cv2
+import csv
+import heapq
+import importlib
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Union
-import spacy
+from typing import Dict, Iterable, List, NamedTuple, Tuple, Optional, Union
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import requests
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 import pickle
 import os
-
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
+import shutil
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class _LazyModule:
+    """Stand-in for a heavy module that is imported on first attribute access"""
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._failed = False
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def available(self) -> bool:
+        # A failed import is remembered; retrying it costs a full sys.path scan
+        if self._failed:
+            return False
+        try:
+            self._load()
+            return True
+        except ImportError:
+            self._failed = True
+            return False
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+# Heavy dependencies are imported when a feature first needs them, so that
+# importing this module stays cheap for tools that only read metadata
+faiss = _LazyModule('faiss')
+cv2 = _LazyModule('cv2')
+zstd = _LazyModule('zstandard')
+
+# Used when NLTK or its corpora are not installed locally
+_FALLBACK_STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can did do does doing down during each
+few for from further had has have having he her here hers herself him himself
+his how i if in into is it its itself just me more most my myself no nor not
+now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what
+when where which while who whom why will with you your yours yourself
+yourselves
+""".split())
+
+def _load_nltk_resources(data_paths: List[str]):
+    """
+    Resolve NLTK stopwords and WordNet from local data directories only.
+
+    Nothing is ever downloaded, so air-gapped hosts never block on the
+    network; missing corpora fall back to a built-in stopword list and no
+    lemmatization.
+    """
+    try:
+        import nltk
+    except ImportError:
+        logger.warning("NLTK not installed. Using built-in stopwords without lemmatization.")
+        return set(_FALLBACK_STOP_WORDS), None
+    
+    for path in reversed(data_paths):
+        if path and os.path.isdir(path) and path not in nltk.data.path:
+            nltk.data.path.insert(0, path)
+    
+    try:
+        nltk.data.find('corpora/stopwords')
+        from nltk.corpus import stopwords
+        stop_words = set(stopwords.words('english'))
+    except LookupError:
+        logger.warning("NLTK stopwords corpus not found locally. Using built-in stopwords.")
+        stop_words = set(_FALLBACK_STOP_WORDS)
+    
+    try:
+        nltk.data.find('corpora/wordnet')
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+    except LookupError:
+        logger.warning("NLTK WordNet corpus not found locally. Skipping lemmatization.")
+        lemmatizer = None
+    
+    return stop_words, lemmatizer
+
 @dataclass
 class SearchResult:
     """Data class for search results"""
@@ -55,6 +125,742 @@ class SearchResult:
     citation_count: int
     visual_similarity: float = 0.0
     relevance_explanation: str = ""
+    row_id: int = -1
+
+@dataclass
+class RankedHit:
+    """Ids and scores of one ranked candidate, without text or display metadata"""
+    row_id: int
+    patent_id: str
+    similarity_score: float
+    metadata_score: float
+    final_score: float
+    visual_similarity: float = 0.0
+
+class _LayeredDict(MutableMapping):
+    """
+    Dict that shares a read-only base between copies.
+
+    Writes go to a small overlay (deletions are recorded as ``_DELETED``), so
+    ``copy()`` costs O(overlay) instead of O(len). ``folded()`` flattens the
+    overlay into a new base; writers do that when they rebuild the indices
+    anyway, which keeps the overlay as small as the index delta segments.
+    """
+
+    _DELETED = object()
+
+    def __init__(self, base: Optional[Dict] = None):
+        self._base = base if base is not None else {}
+        self._overlay = {}
+        self._size = len(self._base)
+
+    def __getitem__(self, key):
+        if key in self._overlay:
+            value = self._overlay[key]
+            if value is self._DELETED:
+                raise KeyError(key)
+            return value
+        return self._base[key]
+
+    def get(self, key, default=None):
+        value = self._overlay[key] if key in self._overlay else self._base.get(key, default)
+        return default if value is self._DELETED else value
+
+    def __contains__(self, key) -> bool:
+        if key in self._overlay:
+            return self._overlay[key] is not self._DELETED
+        return key in self._base
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._size += 1
+        self._overlay[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._size -= 1
+        if key in self._base:
+            self._overlay[key] = self._DELETED
+        else:
+            del self._overlay[key]
+
+    def __iter__(self):
+        overlay = self._overlay
+        for key in self._base:
+            if overlay.get(key) is not self._DELETED:
+                yield key
+        for key, value in overlay.items():
+            if value is not self._DELETED and key not in self._base:
+                yield key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def copy(self) -> '_LayeredDict':
+        clone = _LayeredDict.__new__(_LayeredDict)
+        clone._base = self._base
+        clone._overlay = dict(self._overlay)
+        clone._size = self._size
+        return clone
+
+    def folded(self) -> '_LayeredDict':
+        """Copy with the overlay merged into a new, unshared base"""
+        if not self._overlay:
+            return _LayeredDict(self._base)
+        base = dict(self._base)
+        for key, value in self._overlay.items():
+            if value is self._DELETED:
+                del base[key]
+            else:
+                base[key] = value
+        return _LayeredDict(base)
+
+def _fork(mapping, fold: bool = False) -> _LayeredDict:
+    """Writable copy of a published mapping for the next generation"""
+    if not isinstance(mapping, _LayeredDict):
+        # Published mappings are never modified, so they can serve as the base
+        return _LayeredDict(mapping)
+    return mapping.folded() if fold else mapping.copy()
+
+class PatentDocumentStore:
+    """
+    Block-compressed store for patent text, addressed by row id.
+
+    Documents are grouped into blocks of ``block_size`` and compressed with
+    zstd (zlib when zstandard is not installed). The first documents are held
+    uncompressed until ``training_samples`` of them have arrived, then a zstd
+    dictionary is trained on them. With ``retrain_interval`` set, a new
+    dictionary is trained on the most recent documents after that many more
+    arrive; blocks keep the dictionary they were written with. Reading a row
+    decompresses only its block, and recently used blocks are cached.
+    Blocks are immutable once written, so copies made for a new index
+    generation share them with the published one.
+    """
+    
+    TEXT_FIELDS = ('abstract', 'claims', 'original_text', 'processed_text')
+    
+    _CODEC_ZSTD_DICT = b'd'  # version 1 stores: the one dictionary
+    _CODEC_ZSTD_DICTS = b'D'  # followed by a 2-byte dictionary number
+    _CODEC_ZSTD = b's'
+    _CODEC_ZLIB = b'l'
+
+    def __init__(self, block_size: int = 32, compression_level: int = 3,
+                 training_samples: int = 1000, dictionary_size: int = 112640,
+                 cache_blocks: int = 64, retrain_interval: int = 0):
+        self.block_size = block_size
+        self.compression_level = compression_level
+        self.training_samples = training_samples
+        self.dictionary_size = dictionary_size
+        self.cache_blocks = cache_blocks
+        self.retrain_interval = retrain_interval
+        
+        self._blocks: List[bytes] = []
+        self._locations: Dict[int, Tuple[int, int]] = {}
+        self._pending: Dict[int, bytes] = {}
+        self._dictionaries: List[bytes] = []
+        self._since_training = 0  # documents added since the last training attempt
+        # Without zstd there is nothing to train, so documents skip the buffer
+        self._trains_dictionaries = zstd.available
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._locations) + len(self._pending)
+
+    def __contains__(self, row_id: int) -> bool:
+        return row_id in self._locations or row_id in self._pending
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by stored text"""
+        return (sum(len(block) for block in self._blocks) +
+                sum(len(record) for record in self._pending.values()) +
+                sum(len(dictionary) for dictionary in self._dictionaries))
+
+    def put(self, row_id: int, document: Dict[str, str]):
+        """Store the text fields of one document"""
+        record = json.dumps(
+            {name: document.get(name, '') for name in self.TEXT_FIELDS},
+            ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+        self._pending[row_id] = record
+        
+        if self._trains_dictionaries:
+            self._since_training += 1
+            if self._training_due():
+                self.train_dictionary()
+            
+            # Hold back the first documents so they are compressed with the
+            # dictionary trained on them; a failed training releases them
+            if not self._dictionaries and len(self._pending) < self.training_samples:
+                return
+        
+        while len(self._pending) >= self.block_size:
+            self._flush_block()
+
+    def flush(self):
+        """Compress every buffered document, including a partial last block"""
+        while self._pending:
+            self._flush_block()
+
+    def get(self, row_id: int) -> Dict[str, str]:
+        """Load the text fields of one document"""
+        record = self._pending.get(row_id)
+        if record is None:
+            location = self._locations.get(row_id)
+            if location is None:
+                return {name: '' for name in self.TEXT_FIELDS}
+            block_no, slot = location
+            record = self._read_block(block_no)[slot]
+        return json.loads(record.decode('utf-8'))
+
+    def copy(self, fold: bool = False) -> 'PatentDocumentStore':
+        """Writable copy for the next index generation; see _fork for ``fold``"""
+        clone = PatentDocumentStore.__new__(PatentDocumentStore)
+        clone.__dict__.update(self.__dict__)
+        clone._blocks = list(self._blocks)
+        clone._locations = _fork(self._locations, fold)
+        clone._pending = dict(self._pending)
+        clone._dictionaries = list(self._dictionaries)
+        # Copies number their new blocks independently, so each needs its own
+        # cache; the blocks that exist now are shared and can stay cached
+        with self._cache_lock:
+            clone._cache = OrderedDict(self._cache)
+        clone._cache_lock = threading.Lock()
+        return clone
+
+    def without(self, row_ids) -> 'PatentDocumentStore':
+        """New store holding every document except ``row_ids``"""
+        row_ids = set(row_ids)
+        store = PatentDocumentStore(
+            self.block_size, self.compression_level, self.training_samples,
+            self.dictionary_size, self.cache_blocks, self.retrain_interval
+        )
+        # Every block is rewritten, so only the newest dictionary is needed
+        store._dictionaries = self._dictionaries[-1:]
+        store._since_training = self._since_training
+        
+        rows_by_block = {}
+        for row_id, (block_no, slot) in self._locations.items():
+            if row_id not in row_ids:
+                rows_by_block.setdefault(block_no, []).append((slot, row_id))
+        for block_no in sorted(rows_by_block):
+            records = self._read_block(block_no)
+            for slot, row_id in sorted(rows_by_block[block_no]):
+                store._pending[row_id] = records[slot]
+                if len(store._pending) >= store.block_size:
+                    store._flush_block()
+        for row_id, record in self._pending.items():
+            if row_id not in row_ids:
+                store._pending[row_id] = record
+        
+        return store
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            pickle.dump({
+                'version': 2,
+                'block_size': self.block_size,
+                'compression_level': self.compression_level,
+                'dictionaries': self._dictionaries,
+                'since_training': self._since_training,
+                'blocks': self._blocks,
+                'locations': dict(self._locations),
+                'pending': self._pending
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> 'PatentDocumentStore':
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        
+        kwargs.setdefault('block_size', state['block_size'])
+        kwargs.setdefault('compression_level', state['compression_level'])
+        store = cls(**kwargs)
+        if state['version'] == 1:
+            store._dictionaries = [state['dictionary']] if state['dictionary'] is not None else []
+            if not store._dictionaries:
+                store._since_training = len(state['locations']) + len(state['pending'])
+        else:
+            store._dictionaries = state['dictionaries']
+            store._since_training = state['since_training']
+        store._blocks = state['blocks']
+        store._locations = state['locations']
+        store._pending = state['pending']
+        return store
+
+    def _training_due(self) -> bool:
+        if not self._trains_dictionaries:
+            return False
+        if not self._dictionaries:
+            return self._since_training >= self.training_samples
+        return bool(self.retrain_interval) and self._since_training >= self.retrain_interval
+
+    def train_dictionary(self) -> bool:
+        """
+        Train a new compression dictionary on the most recent documents.
+
+        Blocks already written keep the dictionary they were compressed with;
+        blocks written afterwards use the new one. Returns False when zstd is
+        unavailable or training fails, in which case it is retried after
+        another ``training_samples`` (or ``retrain_interval``) documents.
+        """
+        self._since_training = 0
+        if not zstd.available:
+            return False
+        
+        samples = list(self._pending.values())
+        block_no = len(self._blocks) - 1
+        while len(samples) < self.training_samples and block_no >= 0:
+            samples.extend(self._read_block(block_no))
+            block_no -= 1
+        samples = samples[:self.training_samples]
+        
+        try:
+            dictionary = zstd.train_dictionary(self.dictionary_size, samples).as_bytes()
+        except Exception as e:
+            logger.warning(f"Could not train compression dictionary on {len(samples)} patent documents, "
+                           f"compressing without it for now: {e}")
+            return False
+        
+        self._dictionaries.append(dictionary)
+        logger.info(f"Trained {len(dictionary)} byte compression dictionary "
+                    f"on {len(samples)} patent documents")
+        return True
+
+    def _flush_block(self):
+        rows = list(self._pending)[:self.block_size]
+        records = [self._pending[row_id] for row_id in rows]
+        
+        payload = struct.pack(f'<I{len(records)}I', len(records), *(len(r) for r in records))
+        payload += b''.join(records)
+        
+        block_no = len(self._blocks)
+        self._blocks.append(self._compress(payload))
+        
+        # Publish the new locations before dropping the pending copies
+        for slot, row_id in enumerate(rows):
+            self._locations[row_id] = (block_no, slot)
+        for row_id in rows:
+            del self._pending[row_id]
+
+    def _compress(self, payload: bytes) -> bytes:
+        if not zstd.available:
+            return self._CODEC_ZLIB + zlib.compress(payload, min(self.compression_level, 9))
+        if self._dictionaries:
+            number = len(self._dictionaries) - 1
+            compressor = zstd.ZstdCompressor(
+                level=self.compression_level,
+                dict_data=zstd.ZstdCompressionDict(self._dictionaries[number])
+            )
+            return self._CODEC_ZSTD_DICTS + struct.pack('<H', number) + compressor.compress(payload)
+        return self._CODEC_ZSTD + zstd.ZstdCompressor(level=self.compression_level).compress(payload)
+
+    def _decompress(self, block: bytes) -> bytes:
+        codec, data = block[:1], block[1:]
+        if codec == self._CODEC_ZLIB:
+            return zlib.decompress(data)
+        if codec == self._CODEC_ZSTD_DICT:
+            return zstd.ZstdDecompressor(
+                dict_data=zstd.ZstdCompressionDict(self._dictionaries[0])
+            ).decompress(data)
+        if codec == self._CODEC_ZSTD_DICTS:
+            number = struct.unpack_from('<H', data)[0]
+            return zstd.ZstdDecompressor(
+                dict_data=zstd.ZstdCompressionDict(self._dictionaries[number])
+            ).decompress(data[2:])
+        return zstd.ZstdDecompressor().decompress(data)
+
+    def _read_block(self, block_no: int) -> List[bytes]:
+        with self._cache_lock:
+            records = self._cache.get(block_no)
+            if records is not None:
+                self._cache.move_to_end(block_no)
+                return records
+        
+        payload = self._decompress(self._blocks[block_no])
+        count = struct.unpack_from('<I', payload)[0]
+        lengths = struct.unpack_from(f'<{count}I', payload, 4)
+        
+        records = []
+        offset = 4 + 4 * count
+        for length in lengths:
+            records.append(payload[offset:offset + length])
+            offset += length
+        
+        with self._cache_lock:
+            self._cache[block_no] = records
+            if len(self._cache) > self.cache_blocks:
+                self._cache.popitem(last=False)
+        return records
+
+class _CitationArrays(NamedTuple):
+    """Immutable arrays behind one version of the citation graph"""
+    version: int
+    node_ids: Dict[str, int]
+    patent_ids: List[str]
+    citing: np.ndarray
+    cited: np.ndarray
+    forward_indptr: np.ndarray
+    forward_indices: np.ndarray
+    backward_indptr: np.ndarray
+    backward_indices: np.ndarray
+
+class CitationGraph:
+    """
+    Patent citation graph stored as compressed sparse row arrays.
+
+    Forward edges lead from a patent to the patents that cite it, backward
+    edges to the patents it cites. Each ingest builds a new set of arrays
+    and swaps it in, so traversals never see a partially built graph.
+    Influence scores are a PageRank over the citation matrix, computed with
+    sparse matrix products and cached per graph version.
+    """
+
+    def __init__(self):
+        empty = np.zeros(0, dtype=np.int32)
+        self._arrays = _CitationArrays(
+            version=0, node_ids={}, patent_ids=[], citing=empty, cited=empty,
+            forward_indptr=np.zeros(1, dtype=np.int64), forward_indices=empty,
+            backward_indptr=np.zeros(1, dtype=np.int64), backward_indices=empty
+        )
+        self._influence_cache: Tuple[int, Optional[np.ndarray]] = (-1, None)
+        self._ingest_lock = threading.Lock()
+
+    def __contains__(self, patent_id: str) -> bool:
+        return patent_id in self._arrays.node_ids
+
+    @property
+    def version(self) -> int:
+        return self._arrays.version
+
+    @property
+    def num_patents(self) -> int:
+        return len(self._arrays.patent_ids)
+
+    @property
+    def num_citations(self) -> int:
+        return len(self._arrays.citing)
+
+    def ingest(self, citations: Iterable[Tuple[str, str]]) -> int:
+        """Add (citing_patent_id, cited_patent_id) pairs; returns the number read"""
+        with self._ingest_lock:
+            current = self._arrays
+            node_ids = dict(current.node_ids)
+            patent_ids = list(current.patent_ids)
+            
+            def node(patent_id: str) -> int:
+                node_id = node_ids.get(patent_id)
+                if node_id is None:
+                    node_id = node_ids[patent_id] = len(patent_ids)
+                    patent_ids.append(patent_id)
+                return node_id
+            
+            citing, cited = [], []
+            for citing_id, cited_id in citations:
+                if not citing_id or not cited_id or citing_id == cited_id:
+                    continue
+                citing.append(node(citing_id))
+                cited.append(node(cited_id))
+            
+            if not citing:
+                return 0
+            
+            # Merge with the existing edges and drop duplicate citations
+            num_nodes = len(patent_ids)
+            all_citing = np.concatenate([current.citing, np.array(citing, dtype=np.int32)])
+            all_cited = np.concatenate([current.cited, np.array(cited, dtype=np.int32)])
+            keys = np.unique(all_citing.astype(np.int64) * num_nodes + all_cited)
+            all_citing = (keys // num_nodes).astype(np.int32)
+            all_cited = (keys % num_nodes).astype(np.int32)
+            
+            forward_indptr, forward_indices = self._build_csr(all_cited, all_citing, num_nodes)
+            backward_indptr, backward_indices = self._build_csr(all_citing, all_cited, num_nodes)
+            
+            self._arrays = _CitationArrays(
+                version=current.version + 1,
+                node_ids=node_ids,
+                patent_ids=patent_ids,
+                citing=all_citing,
+                cited=all_cited,
+                forward_indptr=forward_indptr,
+                forward_indices=forward_indices,
+                backward_indptr=backward_indptr,
+                backward_indices=backward_indices
+            )
+        
+        logger.info(f"Citation graph version {self.version}: {num_nodes} patents, "
+                    f"{len(all_citing)} citations")
+        return len(citing)
+
+    def ingest_table(self, path: str, citing_column: str = 'citing_patent_id',
+                     cited_column: str = 'cited_patent_id', delimiter: str = ',') -> int:
+        """Ingest a bulk citation table such as a PatentsView CSV/TSV export"""
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f, delimiter=delimiter)
+            return self.ingest(
+                (row[citing_column].strip(), row[cited_column].strip()) for row in reader
+            )
+
+    @staticmethod
+    def _build_csr(sources: np.ndarray, targets: np.ndarray, num_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(sources, kind='stable')
+        indices = targets[order]
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+        return indptr, indices
+
+    def patent_id(self, node_id: int) -> str:
+        return self._arrays.patent_ids[node_id]
+
+    def traverse(self, patent_id: str, depth: int, direction: str = 'forward') -> List[Tuple[str, int]]:
+        """
+        Breadth-first search limited to ``depth`` hops.
+
+        Returns (patent_id, hops) for every patent reached, nearest first.
+        """
+        patent_ids = self._arrays.patent_ids
+        nodes, hops = self.traverse_nodes(patent_id, depth, direction)
+        return [(patent_ids[node], int(h)) for node, h in zip(nodes, hops)]
+
+    def traverse_nodes(self, patent_id: str, depth: int,
+                       direction: str = 'forward') -> Tuple[np.ndarray, np.ndarray]:
+        """Array form of traverse(): node ids reached and their hop counts"""
+        arrays = self._arrays
+        start = arrays.node_ids.get(patent_id)
+        if start is None or depth < 1:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        
+        if direction == 'forward':
+            indptr, indices = arrays.forward_indptr, arrays.forward_indices
+        else:
+            indptr, indices = arrays.backward_indptr, arrays.backward_indices
+        
+        visited = np.zeros(len(arrays.patent_ids), dtype=bool)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        reached_nodes, reached_hops = [], []
+        
+        for hops in range(1, depth + 1):
+            # Gather the adjacency slices of the whole frontier at once
+            starts = indptr[frontier]
+            lengths = indptr[frontier + 1] - starts
+            total = int(lengths.sum())
+            if total == 0:
+                break
+            
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+            neighbours = np.unique(indices[offsets])
+            neighbours = neighbours[~visited[neighbours]]
+            if len(neighbours) == 0:
+                break
+            
+            visited[neighbours] = True
+            frontier = neighbours.astype(np.int64)
+            reached_nodes.append(frontier)
+            reached_hops.append(np.full(len(frontier), hops, dtype=np.int64))
+        
+        if not reached_nodes:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(reached_nodes), np.concatenate(reached_hops)
+
+    def influence_scores(self, damping: float = 0.85, tolerance: float = 1e-8,
+                         max_iterations: int = 100) -> np.ndarray:
+        """PageRank over citations, scaled so the most influential patent scores 1.0"""
+        arrays = self._arrays
+        cached_version, cached_scores = self._influence_cache
+        if cached_version == arrays.version and cached_scores is not None:
+            return cached_scores
+        
+        from scipy import sparse
+        
+        num_nodes = len(arrays.patent_ids)
+        if num_nodes == 0:
+            return np.zeros(0)
+        
+        # Column-stochastic matrix: each citing patent spreads its rank over
+        # the patents it cites
+        out_degree = np.bincount(arrays.citing, minlength=num_nodes).astype(np.float64)
+        weights = 1.0 / out_degree[arrays.citing]
+        transition = sparse.csr_matrix(
+            (weights, (arrays.cited, arrays.citing)), shape=(num_nodes, num_nodes)
+        )
+        dangling = out_degree == 0
+        
+        rank = np.full(num_nodes, 1.0 / num_nodes)
+        for _ in range(max_iterations):
+            dangling_mass = rank[dangling].sum() / num_nodes
+            updated = damping * (transition @ rank + dangling_mass) + (1.0 - damping) / num_nodes
+            converged = np.abs(updated - rank).sum() < tolerance
+            rank = updated
+            if converged:
+                break
+        
+        scores = rank / rank.max()
+        self._influence_cache = (arrays.version, scores)
+        return scores
+
+    def influence(self, patent_id: str) -> float:
+        """Influence score of one patent, 0.0 when it has no citation data"""
+        node_id = self._arrays.node_ids.get(patent_id)
+        if node_id is None:
+            return 0.0
+        return float(self.influence_scores()[node_id])
+
+    def citation_count(self, patent_id: str) -> int:
+        """Number of patents citing this one, read from the forward CSR row"""
+        arrays = self._arrays
+        node_id = arrays.node_ids.get(patent_id)
+        if node_id is None:
+            return 0
+        return int(arrays.forward_indptr[node_id + 1] - arrays.forward_indptr[node_id])
+
+    def save(self, path: str):
+        arrays = self._arrays
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                patent_ids=np.array(arrays.patent_ids, dtype=str),
+                citing=arrays.citing,
+                cited=arrays.cited
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'CitationGraph':
+        graph = cls()
+        with np.load(path) as data:
+            patent_ids = data['patent_ids'].tolist()
+            citing = data['citing']
+            cited = data['cited']
+        graph.ingest((patent_ids[a], patent_ids[b]) for a, b in zip(citing, cited))
+        return graph
+
+def _empty_like(index):
+    """New, empty row-id mapped flat index with the dimension and metric of index"""
+    return faiss.index_factory(index.d, 'IDMap2,Flat', index.metric_type)
+
+def _copy_delta(base, delta):
+    """Writable copy of a delta segment, or a new one if base has none yet"""
+    if base is None:
+        return None
+    return faiss.clone_index(delta) if delta is not None else _empty_like(base)
+
+def _fold_segments(base, delta):
+    """Copy of base with the rows of a delta segment appended"""
+    merged = faiss.clone_index(base)
+    if delta is not None and delta.ntotal:
+        merged.add_with_ids(delta.index.reconstruct_n(0, delta.ntotal), faiss.vector_to_array(delta.id_map))
+    return merged
+
+def _reconstruct_positions(segments: List, positions: np.ndarray) -> np.ndarray:
+    """Vectors at ascending positions of the concatenated row-id mapped segments"""
+    parts = []
+    start = 0
+    for segment in segments:
+        end = start + segment.ntotal
+        inside = positions[(positions >= start) & (positions < end)]
+        parts.append(segment.index.reconstruct_batch(inside - start))
+        start = end
+    return np.vstack(parts)
+
+def _search_segments(segments: List, queries: np.ndarray, k: int,
+                     params=None) -> Tuple[np.ndarray, np.ndarray]:
+    """k-nearest search over several index segments, merged per query"""
+    results = [segment.search(queries, k, params=params) for segment in segments if segment.ntotal]
+    if not results:
+        return segments[0].search(queries, k)
+    if len(results) == 1:
+        return results[0]
+    
+    distances = np.hstack([distances for distances, _ in results])
+    ids = np.hstack([ids for _, ids in results])
+    keys = -distances if segments[0].metric_type == faiss.METRIC_INNER_PRODUCT else distances
+    order = np.argsort(keys, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(distances, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+def _range_search_segments(segments: List, queries: np.ndarray,
+                           threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Range search over several index segments, merged into one (lims, distances, ids)"""
+    results = [segment.range_search(queries, threshold) for segment in segments if segment.ntotal]
+    if len(results) == 1:
+        return results[0]
+    if not results:
+        return np.zeros(len(queries) + 1, dtype=np.int64), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+    
+    owners = np.concatenate([np.repeat(np.arange(len(queries)), np.diff(lims).astype(np.int64))
+                             for lims, _, _ in results])
+    order = np.argsort(owners, kind='stable')
+    lims = np.zeros(len(queries) + 1, dtype=np.int64)
+    lims[1:] = np.cumsum(np.bincount(owners, minlength=len(queries)))
+    distances = np.concatenate([distances for _, distances, _ in results])[order]
+    ids = np.concatenate([ids for _, _, ids in results])[order]
+    return lims, distances, ids
+
+@dataclass
+class IndexSnapshot:
+    """
+    One published generation of the search indices.
+
+    Readers take a reference to the current snapshot and use it for the whole
+    query; a snapshot is never modified once it has been published. Writers
+    build the next generation on copies and publish it by swapping the
+    reference, so queries never observe a half-indexed batch.
+
+    Both indices are ID-mapped by row id. Small writes go to delta segments
+    (``text_delta``/``visual_delta``) so the large base indices can be shared
+    between generations instead of copied; readers search base and delta
+    together. Deleted rows stay in the indices as tombstones until compaction
+    removes them.
+    """
+    generation: int
+    text_index: object
+    visual_index: object
+    metadata_store: Dict
+    documents: Optional[PatentDocumentStore] = None
+    tombstones: frozenset = frozenset()
+    patent_rows: Dict[str, int] = field(default_factory=dict)
+    next_row_id: int = 0
+    text_delta: object = None
+    visual_delta: object = None
+    _search_params: object = field(default=None, init=False, repr=False, compare=False)
+
+    def search_params(self):
+        """FAISS search parameters that skip tombstoned rows, built once per generation"""
+        if not self.tombstones:
+            return None
+        if self._search_params is None:
+            dead = faiss.IDSelectorBatch(np.fromiter(self.tombstones, dtype=np.int64, count=len(self.tombstones)))
+            selector = faiss.IDSelectorNot(dead)
+            params = faiss.SearchParameters(sel=selector)
+            # SWIG does not keep the selectors alive through the params object
+            params.selectors = (dead, selector)
+            self._search_params = params
+        return self._search_params
+
+    def text_segments(self) -> List:
+        return [index for index in (self.text_index, self.text_delta) if index is not None]
+
+    def visual_segments(self) -> List:
+        return [index for index in (self.visual_index, self.visual_delta) if index is not None]
+
+    @property
+    def text_count(self) -> int:
+        return sum(index.ntotal for index in self.text_segments())
+
+    @property
+    def visual_count(self) -> int:
+        return sum(index.ntotal for index in self.visual_segments())
+
+    def live_row(self, patent_id: str) -> Optional[int]:
+        """Row id currently holding a patent, or None if absent or deleted"""
+        row_id = self.patent_rows.get(patent_id)
+        if row_id is None or row_id in self.tombstones:
+            return None
+        return row_id
 
 class IPSemanticSearch:
     """
@@ -63,47 +869,170 @@ class IPSemanticSearch:
     
     def __init__(self, config: Dict):
         self.config = config
-        self.embedding_model = None
         self.visual_model = None
-        self.text_index = None
-        self.visual_index = None
-        self.metadata_store = {}
-        self.stop_words = set(stopwords.words('english'))
-        self.lemmatizer = WordNetLemmatizer()
+        self._embedding_model = None
+        self._nlp = None
+        self._nlp_loaded = False
+        self._stop_words = None
+        self._lemmatizer = None
+        self._model_lock = threading.Lock()
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._write_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._saves_in_progress = set()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self.citation_graph = CitationGraph()
         
-        # Initialize models and indices
+        # Initialize models and indices; the embedding and NLP models
+        # themselves are loaded on first use
         self._initialize_models()
         self._load_or_create_indices()
         
         logger.info("IP Semantic Search Engine initialized successfully")
 
+    @property
+    def embedding_model(self):
+        if self._embedding_model is None:
+            with self._model_lock:
+                if self._embedding_model is None:
+                    self._embedding_model = self._load_embedding_model()
+        return self._embedding_model
+
+    @property
+    def nlp(self):
+        if not self._nlp_loaded:
+            with self._model_lock:
+                if not self._nlp_loaded:
+                    self._nlp = self._load_spacy_model()
+                    self._nlp_loaded = True
+        return self._nlp
+
+    @property
+    def stop_words(self) -> set:
+        if self._stop_words is None:
+            self._load_nltk()
+        return self._stop_words
+
+    @property
+    def lemmatizer(self):
+        if self._stop_words is None:
+            self._load_nltk()
+        return self._lemmatizer
+
+    @property
+    def text_index(self):
+        """Base text index of the current generation; see IndexSnapshot.text_delta"""
+        return self._snapshot.text_index if self._snapshot else None
+
+    @property
+    def visual_index(self):
+        return self._snapshot.visual_index if self._snapshot else None
+
+    @property
+    def metadata_store(self) -> Dict:
+        return self._snapshot.metadata_store if self._snapshot else {}
+
+    def snapshot(self) -> Optional[IndexSnapshot]:
+        """Return the currently published index generation"""
+        return self._snapshot
+
+    def _begin_generation(self, append_rows: Optional[int] = None) -> IndexSnapshot:
+        """
+        Create a private, writable copy of the current generation.
+
+        A write that only appends ``append_rows`` rows shares the published
+        base indices and copies just the delta segments, so a single-document
+        update costs O(delta) rather than O(corpus). Other writes, and appends
+        that would grow the delta past ``delta_max_rows``, fold the delta into
+        a fresh copy of the base and leave the new generation without a delta.
+        """
+        current = self._snapshot
+        delta_rows = current.text_delta.ntotal if current.text_delta is not None else 0
+        append = append_rows is not None and delta_rows + append_rows <= self.config.get('delta_max_rows', 4096)
+        # Metadata and row maps follow the indices: appends copy only their
+        # overlays, and the overlays are folded whenever the delta is
+        common = dict(
+            generation=current.generation + 1,
+            metadata_store=_fork(current.metadata_store, fold=not append),
+            documents=current.documents.copy(fold=not append),
+            tombstones=current.tombstones,
+            patent_rows=_fork(current.patent_rows, fold=not append),
+            next_row_id=current.next_row_id
+        )
+        
+        if append:
+            return IndexSnapshot(
+                text_index=current.text_index,
+                visual_index=current.visual_index,
+                text_delta=_copy_delta(current.text_index, current.text_delta),
+                visual_delta=_copy_delta(current.visual_index, current.visual_delta),
+                **common
+            )
+        
+        visual_index = current.visual_index
+        return IndexSnapshot(
+            text_index=_fold_segments(current.text_index, current.text_delta),
+            visual_index=_fold_segments(visual_index, current.visual_delta) if visual_index is not None else None,
+            **common
+        )
+
+    def _publish(self, snapshot: IndexSnapshot):
+        """Atomically make a finished generation visible to readers"""
+        # A single reference assignment is atomic, so in-flight queries keep
+        # the generation they started with and new queries see this one
+        self._snapshot = snapshot
+        logger.info(f"Published index generation {snapshot.generation} "
+                    f"({snapshot.text_count} documents)")
+
     def _initialize_models(self):
-        """Initialize embedding and visual models"""
+        """Initialize visual models; text models are deferred to first use"""
         try:
+            # Initialize visual recognition model
+            self._initialize_visual_model()
+            
+            logger.info("Models initialized successfully")
+            
+        except Exception as e:
+            logger.error(f"Error initializing models: {e}")
+            raise
+
+    def _load_embedding_model(self):
+        """Load the sentence transformer used for text embeddings"""
+        try:
+            from sentence_transformers import SentenceTransformer
+            
             # Load patent-specific sentence transformer
             model_name = self.config.get('embedding_model', 'sentence-transformers/all-MiniLM-L6-v2')
-            self.embedding_model = SentenceTransformer(model_name)
+            model = SentenceTransformer(model_name)
             
             # Fine-tune on patent data if available
             if self.config.get('patent_training_data'):
                 self._fine_tune_embeddings()
             
-            # Load spaCy model for NLP preprocessing
-            try:
-                self.nlp = spacy.load("en_core_web_sm")
-            except OSError:
-                logger.warning("spaCy model not found. Using basic preprocessing.")
-                self.nlp = None
-            
-            # Initialize visual recognition model
-            self._initialize_visual_model()
-            
-            logger.info("Models initialized successfully")
+            logger.info(f"Loaded embedding model {model_name}")
+            return model
             
         except Exception as e:
-            logger.error(f"Error initializing models: {e}")
+            logger.error(f"Error loading embedding model: {e}")
             raise
 
+    def _load_spacy_model(self):
+        """Load spaCy for NLP preprocessing, or None for basic preprocessing"""
+        try:
+            import spacy
+            return spacy.load("en_core_web_sm")
+        except (ImportError, OSError):
+            logger.warning("spaCy model not found. Using basic preprocessing.")
+            return None
+
+    def _load_nltk(self):
+        bundled_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+        self._stop_words, self._lemmatizer = _load_nltk_resources([
+            self.config.get('nltk_data_path'),
+            os.environ.get('NLTK_DATA'),
+            bundled_path
+        ])
+
     def _initialize_visual_model(self):
         """Initialize visual recognition model for technical drawings"""
         try:
@@ -198,31 +1127,96 @@ class IPSemanticSearch:
             index_path = self.config.get('index_path', './indices/')
             os.makedirs(index_path, exist_ok=True)
             
+            # Saved generations live in their own directories behind the
+            # CURRENT pointer; older releases wrote straight into index_path
+            saved = self._saved_generation(index_path)
+            if saved is not None:
+                index_path = os.path.join(index_path, saved[1])
+            
             text_index_file = os.path.join(index_path, 'text_index.faiss')
             visual_index_file = os.path.join(index_path, 'visual_index.faiss')
             metadata_file = os.path.join(index_path, 'metadata.pkl')
+            state_file = os.path.join(index_path, 'index_state.pkl')
+            documents_file = os.path.join(index_path, 'documents.pkl')
+            citation_file = os.path.join(index_path, 'citation_graph.npz')
+            
+            if os.path.exists(citation_file):
+                self.citation_graph = CitationGraph.load(citation_file)
             
             if os.path.exists(text_index_file) and os.path.exists(metadata_file):
                 # Load existing indices
-                self.text_index = faiss.read_index(text_index_file)
+                with open(metadata_file, 'rb') as f:
+                    metadata_store = pickle.load(f)
+                
+                if os.path.exists(documents_file):
+                    documents = PatentDocumentStore.load(
+                        documents_file, retrain_interval=self.config.get('document_dictionary_retrain_interval', 0)
+                    )
+                else:
+                    documents = self._create_document_store()
+                self._migrate_document_text(metadata_store, documents)
+                
+                state = {}
+                if os.path.exists(state_file):
+                    with open(state_file, 'rb') as f:
+                        state = pickle.load(f)
+                
+                text_index = self._ensure_id_mapped(
+                    faiss.read_index(text_index_file), sorted(metadata_store)
+                )
+                text_index = self._load_delta(text_index, os.path.join(index_path, 'text_delta.faiss'))
                 
                 if os.path.exists(visual_index_file):
-                    self.visual_index = faiss.read_index(visual_index_file)
+                    # Older visual indices were positional over the patents
+                    # that had drawings, in indexing order
+                    visual_rows = sorted(
+                        idx for idx, metadata in metadata_store.items()
+                        if metadata.get('has_visual', False)
+                    )
+                    visual_index = self._ensure_id_mapped(
+                        faiss.read_index(visual_index_file), visual_rows
+                    )
+                else:
+                    visual_index = faiss.IndexIDMap2(faiss.IndexFlatL2(self.visual_model['dimension']))
+                visual_index = self._load_delta(visual_index, os.path.join(index_path, 'visual_delta.faiss'))
                 
-                with open(metadata_file, 'rb') as f:
-                    self.metadata_store = pickle.load(f)
+                tombstones = frozenset(state.get('tombstones', ()))
+                patent_rows = {}
+                for idx in sorted(metadata_store):
+                    if idx not in tombstones:
+                        patent_rows[metadata_store[idx]['patent_id']] = idx
+                
+                self._snapshot = IndexSnapshot(
+                    generation=state.get('generation', 0),
+                    text_index=text_index,
+                    visual_index=visual_index,
+                    metadata_store=metadata_store,
+                    documents=documents,
+                    tombstones=tombstones,
+                    patent_rows=patent_rows,
+                    next_row_id=state.get('next_row_id', max(metadata_store, default=-1) + 1)
+                )
                 
-                logger.info(f"Loaded existing indices with {self.text_index.ntotal} documents")
+                logger.info(f"Loaded existing indices with {text_index.ntotal} documents")
             else:
                 # Create new indices
-                embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
+                embedding_dim = (self.config.get('embedding_dim') or
+                                 self.embedding_model.get_sentence_embedding_dimension())
                 
-                # Create FAISS index for text embeddings
-                self.text_index = faiss.IndexFlatIP(embedding_dim)  # Inner product for cosine similarity
+                # Create FAISS index for text embeddings, addressed by row id
+                text_index = faiss.IndexIDMap2(faiss.IndexFlatIP(embedding_dim))  # Inner product for cosine similarity
                 
-                # Create FAISS index for visual features
+                # Create FAISS index for visual features, sharing the text row ids
                 visual_dim = self.visual_model['dimension']
-                self.visual_index = faiss.IndexFlatL2(visual_dim)
+                visual_index = faiss.IndexIDMap2(faiss.IndexFlatL2(visual_dim))
+                
+                self._snapshot = IndexSnapshot(
+                    generation=0,
+                    text_index=text_index,
+                    visual_index=visual_index,
+                    metadata_store={},
+                    documents=self._create_document_store()
+                )
                 
                 logger.info("Created new empty indices")
                 
@@ -230,6 +1224,55 @@ class IPSemanticSearch:
             logger.error(f"Error loading/creating indices: {e}")
             raise
 
+    def _create_document_store(self) -> PatentDocumentStore:
+        return PatentDocumentStore(
+            block_size=self.config.get('document_block_size', 32),
+            compression_level=self.config.get('document_compression_level', 3),
+            retrain_interval=self.config.get('document_dictionary_retrain_interval', 0)
+        )
+
+    def _migrate_document_text(self, metadata_store: Dict, documents: PatentDocumentStore):
+        """Move patent text kept in metadata by older releases into the document store"""
+        migrated = 0
+        for idx in sorted(metadata_store):
+            metadata = metadata_store[idx]
+            if 'original_text' not in metadata:
+                continue
+            documents.put(idx, metadata)
+            metadata_store[idx] = {
+                key: value for key, value in metadata.items()
+                if key not in PatentDocumentStore.TEXT_FIELDS
+            }
+            migrated += 1
+        
+        if migrated:
+            documents.flush()
+            logger.info(f"Moved text of {migrated} patents into the compressed document store")
+
+    def _load_delta(self, index, delta_file: str):
+        """Append a saved delta segment to a freshly loaded base index"""
+        if not os.path.exists(delta_file):
+            return index
+        delta = faiss.read_index(delta_file)
+        index.add_with_ids(delta.index.reconstruct_n(0, delta.ntotal), faiss.vector_to_array(delta.id_map))
+        return index
+
+    def _ensure_id_mapped(self, index, row_ids: List[int]):
+        """Wrap a positional index from an older release in a row-id map"""
+        if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+            return index
+        
+        vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+        base = faiss.clone_index(index)
+        base.reset()
+        mapped = faiss.IndexIDMap2(base)
+        
+        if vectors is not None:
+            mapped.add_with_ids(vectors, np.array(row_ids[:index.ntotal], dtype='int64'))
+        
+        logger.info(f"Converted positional index with {index.ntotal} vectors to an ID-mapped index")
+        return mapped
+
     def preprocess_text(self, text: str) -> str:
         """Preprocess patent text for better search"""
         try:
@@ -246,10 +1289,12 @@ class IPSemanticSearch:
                 ]
             else:
                 # Basic preprocessing
+                stop_words = self.stop_words
+                lemmatize = self.lemmatizer.lemmatize if self.lemmatizer else (lambda word: word)
                 tokens = [
-                    self.lemmatizer.lemmatize(word) 
+                    lemmatize(word) 
                     for word in text.split() 
-                    if word not in self.stop_words and len(word) > 2
+                    if word not in stop_words and len(word) > 2
                 ]
             
             return ' '.join(tokens)
@@ -260,6 +1305,15 @@ class IPSemanticSearch:
 
     def index_patent_document(self, patent_data: Dict) -> bool:
         """Index a single patent document"""
+        with self._write_lock:
+            snapshot = self._begin_generation(append_rows=1)
+            indexed = self._index_into(snapshot, patent_data)
+            if indexed:
+                self._publish(snapshot)
+            return indexed
+
+    def _index_into(self, snapshot: IndexSnapshot, patent_data: Dict) -> bool:
+        """Add a patent document to an unpublished generation"""
         try:
             patent_id = patent_data['patent_id']
             patent_text = patent_data.get('abstract', '') + ' ' + patent_data.get('claims', '')
@@ -274,31 +1328,45 @@ class IPSemanticSearch:
             # Normalize for cosine similarity
             faiss.normalize_L2(embedding)
             
-            # Add to text index
-            self.text_index.add(embedding)
-            
             # Handle visual data if available
             visual_embedding = None
             if 'image_path' in patent_data:
                 visual_features = self.visual_model['feature_extractor'](patent_data['image_path'])
                 visual_embedding = visual_features.reshape(1, -1).astype('float32')
-                self.visual_index.add(visual_embedding)
             
-            # Store metadata
-            index_id = self.text_index.ntotal - 1
-            self.metadata_store[index_id] = {
+            # Add to text index under a fresh row id
+            index_id = snapshot.next_row_id
+            row_ids = np.array([index_id], dtype='int64')
+            # Appending generations write to the delta, full ones to the base
+            text_target = snapshot.text_delta if snapshot.text_delta is not None else snapshot.text_index
+            text_target.add_with_ids(embedding, row_ids)
+            if visual_embedding is not None:
+                visual_target = snapshot.visual_delta if snapshot.visual_delta is not None else snapshot.visual_index
+                visual_target.add_with_ids(visual_embedding, row_ids)
+            snapshot.next_row_id += 1
+            
+            # Re-indexing a patent supersedes its previous row
+            previous_row = snapshot.live_row(patent_id)
+            if previous_row is not None:
+                snapshot.tombstones = snapshot.tombstones | {previous_row}
+            snapshot.patent_rows[patent_id] = index_id
+            
+            # Store metadata; the text itself goes to the compressed store
+            snapshot.metadata_store[index_id] = {
                 'patent_id': patent_id,
                 'title': patent_data.get('title', ''),
-                'abstract': patent_data.get('abstract', ''),
-                'claims': patent_data.get('claims', ''),
                 'filing_date': patent_data.get('filing_date', ''),
                 'assignee': patent_data.get('assignee', ''),
                 'technology_class': patent_data.get('technology_class', ''),
                 'citation_count': patent_data.get('citation_count', 0),
-                'original_text': patent_text,
-                'processed_text': processed_text,
                 'has_visual': visual_embedding is not None
             }
+            snapshot.documents.put(index_id, {
+                'abstract': patent_data.get('abstract', ''),
+                'claims': patent_data.get('claims', ''),
+                'original_text': patent_text,
+                'processed_text': processed_text
+            })
             
             return True
             
@@ -306,58 +1374,237 @@ class IPSemanticSearch:
             logger.error(f"Error indexing patent {patent_data.get('patent_id', 'unknown')}: {e}")
             return False
 
+    def update_patent(self, patent_data: Dict) -> bool:
+        """
+        Replace an indexed patent with corrected data.
+
+        The new version gets a fresh row and the old row is tombstoned in the
+        same generation, so readers see either the old or the new version.
+        """
+        patent_id = patent_data.get('patent_id')
+        
+        with self._write_lock:
+            if self._snapshot.live_row(patent_id) is None:
+                logger.warning(f"Cannot update patent {patent_id}: not in index")
+                return False
+            
+            snapshot = self._begin_generation(append_rows=1)
+            if not self._index_into(snapshot, patent_data):
+                return False
+            self._publish(snapshot)
+        
+        self._maybe_schedule_compaction()
+        return True
+
+    def delete_patent(self, patent_id: str) -> bool:
+        """
+        Withdraw a patent from search results.
+
+        Deletion only records a tombstone; the vectors and metadata are
+        reclaimed later by compact().
+        """
+        with self._write_lock:
+            current = self._snapshot
+            row_id = current.live_row(patent_id)
+            if row_id is None:
+                logger.warning(f"Cannot delete patent {patent_id}: not in index")
+                return False
+            
+            # Indices and metadata are unchanged, so the new generation can
+            # share them with the current one
+            self._publish(replace(
+                current,
+                generation=current.generation + 1,
+                tombstones=current.tombstones | {row_id}
+            ))
+        
+        self._maybe_schedule_compaction()
+        return True
+
+    def compact(self) -> int:
+        """Remove tombstoned rows from the indices and metadata"""
+        with self._write_lock:
+            current = self._snapshot
+            if not current.tombstones:
+                return 0
+            
+            snapshot = self._begin_generation()
+            dead_rows = np.array(sorted(current.tombstones), dtype='int64')
+            
+            snapshot.text_index.remove_ids(dead_rows)
+            if snapshot.visual_index is not None:
+                snapshot.visual_index.remove_ids(dead_rows)
+            
+            for row_id in current.tombstones:
+                metadata = snapshot.metadata_store.pop(row_id, None)
+                if metadata and snapshot.patent_rows.get(metadata['patent_id']) == row_id:
+                    del snapshot.patent_rows[metadata['patent_id']]
+            snapshot.documents = snapshot.documents.without(current.tombstones)
+            snapshot.tombstones = frozenset()
+            
+            self._publish(snapshot)
+        
+        logger.info(f"Compaction reclaimed {len(dead_rows)} deleted rows")
+        return len(dead_rows)
+
+    def _maybe_schedule_compaction(self):
+        """Start background compaction once tombstones pass the threshold"""
+        snapshot = self._snapshot
+        threshold = max(1, int(snapshot.text_count * self.config.get('compaction_threshold', 0.1)))
+        
+        if len(snapshot.tombstones) < threshold:
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        
+        self._compaction_thread = threading.Thread(
+            target=self.compact, name='ip-search-compaction', daemon=True
+        )
+        self._compaction_thread.start()
+
     def batch_index_patents(self, patent_list: List[Dict]) -> int:
-        """Index multiple patent documents"""
+        """
+        Index multiple patent documents.
+
+        The batch is built into a new index generation while searches keep
+        running against the published one; the new generation becomes
+        visible in a single step once the whole batch has been indexed.
+        """
         successful_count = 0
         
         logger.info(f"Starting batch indexing of {len(patent_list)} patents")
         
-        for i, patent_data in enumerate(patent_list):
-            if i % 100 == 0:
-                logger.info(f"Processed {i}/{len(patent_list)} patents")
+        with self._write_lock:
+            # A batch folds any pending delta into the base it copies anyway
+            snapshot = self._begin_generation()
+            
+            for i, patent_data in enumerate(patent_list):
+                if i % 100 == 0:
+                    logger.info(f"Processed {i}/{len(patent_list)} patents")
+                
+                if self._index_into(snapshot, patent_data):
+                    successful_count += 1
             
-            if self.index_patent_document(patent_data):
-                successful_count += 1
+            self._publish(snapshot)
         
         # Save indices after batch processing
-        self.save_indices()
+        self.save_indices(snapshot)
         
         logger.info(f"Batch indexing completed. {successful_count}/{len(patent_list)} patents indexed successfully")
         return successful_count
 
     def search_prior_art(self, query_text: str, top_k: int = 50, 
                         include_visual: bool = False, 
-                        visual_query_path: str = None) -> List[SearchResult]:
+                        visual_query_path: str = None,
+                        include_text: bool = True,
+                        explain: bool = True,
+                        collapse_families: Optional[bool] = None) -> List[SearchResult]:
         """
         Comprehensive prior art search combining text and visual similarity
         """
         try:
             logger.info(f"Searching prior art for query (top {top_k} results)")
             
+            # Pin one index generation for ranking and materialization
+            snapshot = self._snapshot
+            
+            hits = self.rank_prior_art(query_text, top_k, include_visual, visual_query_path,
+                                       snapshot, collapse_families)
+            results = self.materialize_results(
+                hits, query_text, snapshot, include_text=include_text, explain=explain
+            )
+            
+            logger.info(f"Found {len(results)} relevant results")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in prior art search: {e}")
+            return []
+
+    def rank_prior_art(self, query_text: str, top_k: int = 50,
+                       include_visual: bool = False,
+                       visual_query_path: str = None,
+                       snapshot: Optional[IndexSnapshot] = None,
+                       collapse_families: Optional[bool] = None) -> List[RankedHit]:
+        """
+        Rank prior art by id and score only.
+
+        No patent text, display metadata or explanations are built; pass the
+        hits that are actually shown to materialize_results(), with the same
+        snapshot, to get full SearchResult objects. With collapse_families
+        only the best hit of each patent family (see cluster_patent_families)
+        is kept.
+        """
+        try:
+            snapshot = snapshot or self._snapshot
+            if collapse_families is None:
+                collapse_families = self.config.get('collapse_families', False)
+            
             # Text-based search
-            text_results = self._search_text_similarity(query_text, top_k * 2)
+            text_hits = self._rank_text_similarity(query_text, top_k * 2, snapshot)
             
             # Visual search if requested
-            visual_results = []
+            visual_hits = []
             if include_visual and visual_query_path:
-                visual_results = self._search_visual_similarity(visual_query_path, top_k)
+                visual_hits = self._rank_visual_similarity(visual_query_path, top_k, snapshot)
             
             # Combine and rank results
-            combined_results = self._combine_search_results(text_results, visual_results, top_k)
-            
-            # Add relevance explanations
-            for result in combined_results:
-                result.relevance_explanation = self._explain_relevance(query_text, result)
+            if not collapse_families:
+                return self._combine_hits(text_hits, visual_hits, top_k)
             
-            logger.info(f"Found {len(combined_results)} relevant results")
-            return combined_results
+            combined = self._combine_hits(text_hits, visual_hits, len(text_hits) + len(visual_hits))
+            return self._collapse_families(combined, snapshot, top_k)
             
         except Exception as e:
-            logger.error(f"Error in prior art search: {e}")
+            logger.error(f"Error ranking prior art: {e}")
             return []
 
-    def _search_text_similarity(self, query_text: str, top_k: int) -> List[SearchResult]:
+    def materialize_results(self, hits: List[RankedHit], query_text: Optional[str] = None,
+                            snapshot: Optional[IndexSnapshot] = None,
+                            include_text: bool = True,
+                            explain: bool = True) -> List[SearchResult]:
+        """Build full search results for a page of ranked hits"""
+        snapshot = snapshot or self._snapshot
+        results = []
+        
+        for hit in hits:
+            metadata = snapshot.metadata_store.get(hit.row_id, {})
+            result = SearchResult(
+                patent_id=hit.patent_id,
+                title=metadata.get('title', ''),
+                similarity_score=hit.similarity_score,
+                metadata_score=hit.metadata_score,
+                final_score=hit.final_score,
+                patent_text='',
+                filing_date=metadata.get('filing_date', ''),
+                assignee=metadata.get('assignee', ''),
+                technology_class=metadata.get('technology_class', ''),
+                citation_count=self._citation_count(hit.patent_id, metadata),
+                visual_similarity=hit.visual_similarity,
+                row_id=hit.row_id
+            )
+            
+            # Decompress text only for the rows that are actually returned
+            if include_text and hit.row_id in snapshot.documents:
+                result.patent_text = snapshot.documents.get(hit.row_id)['original_text']
+            
+            if explain and query_text is not None:
+                result.relevance_explanation = self._explain_relevance(query_text, result)
+            
+            results.append(result)
+        
+        return results
+
+    def _search_text_similarity(self, query_text: str, top_k: int,
+                                snapshot: Optional[IndexSnapshot] = None) -> List[SearchResult]:
         """Search based on text semantic similarity"""
+        snapshot = snapshot or self._snapshot
+        hits = self._rank_text_similarity(query_text, top_k, snapshot)
+        return self.materialize_results(hits, snapshot=snapshot, include_text=False, explain=False)
+
+    def _rank_text_similarity(self, query_text: str, top_k: int,
+                              snapshot: IndexSnapshot) -> List[RankedHit]:
+        """Rank rows by text semantic similarity"""
         try:
             # Preprocess query
             processed_query = self.preprocess_text(query_text)
@@ -367,49 +1614,45 @@ class IPSemanticSearch:
             query_embedding = query_embedding.reshape(1, -1).astype('float32')
             faiss.normalize_L2(query_embedding)
             
-            # Search index
-            similarities, indices = self.text_index.search(query_embedding, top_k)
+            # Search index; deleted rows are filtered out inside FAISS
+            search_k = min(top_k, max(snapshot.text_count, 1))
+            similarities, indices = _search_segments(snapshot.text_segments(), query_embedding, search_k,
+                                                     snapshot.search_params())
             
-            results = []
-            for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
+            hits = []
+            for similarity, idx in zip(similarities[0], indices[0]):
                 if idx == -1:  # FAISS returns -1 for empty results
                     continue
                 
-                metadata = self.metadata_store.get(idx, {})
+                metadata = snapshot.metadata_store.get(idx, {})
                 
                 # Calculate metadata score
                 metadata_score = self._calculate_metadata_score(query_text, metadata)
                 
                 # Combine similarity and metadata scores
-                final_score = similarity * 0.7 + metadata_score * 0.3
+                final_score = float(similarity) * 0.7 + metadata_score * 0.3
                 
-                result = SearchResult(
+                hits.append(RankedHit(
+                    row_id=int(idx),
                     patent_id=metadata.get('patent_id', f'unknown_{idx}'),
-                    title=metadata.get('title', ''),
                     similarity_score=float(similarity),
                     metadata_score=metadata_score,
-                    final_score=final_score,
-                    patent_text=metadata.get('original_text', ''),
-                    filing_date=metadata.get('filing_date', ''),
-                    assignee=metadata.get('assignee', ''),
-                    technology_class=metadata.get('technology_class', ''),
-                    citation_count=metadata.get('citation_count', 0)
-                )
-                
-                results.append(result)
+                    final_score=final_score
+                ))
             
             # Sort by final score
-            results.sort(key=lambda x: x.final_score, reverse=True)
-            return results
+            hits.sort(key=lambda x: x.final_score, reverse=True)
+            return hits
             
         except Exception as e:
             logger.error(f"Error in text similarity search: {e}")
             return []
 
-    def _search_visual_similarity(self, image_path: str, top_k: int) -> List[SearchResult]:
-        """Search based on visual similarity of technical drawings"""
+    def _rank_visual_similarity(self, image_path: str, top_k: int,
+                                snapshot: IndexSnapshot) -> List[RankedHit]:
+        """Rank rows by visual similarity of technical drawings"""
         try:
-            if self.visual_index.ntotal == 0:
+            if snapshot.visual_count == 0:
                 logger.warning("Visual index is empty")
                 return []
             
@@ -417,43 +1660,45 @@ class IPSemanticSearch:
             query_features = self.visual_model['feature_extractor'](image_path)
             query_features = query_features.reshape(1, -1).astype('float32')
             
-            # Search visual index
-            distances, indices = self.visual_index.search(query_features, top_k)
+            # Search visual index; deleted rows are filtered out inside FAISS
+            search_k = min(top_k, snapshot.visual_count)
+            distances, indices = _search_segments(snapshot.visual_segments(), query_features, search_k,
+                                                  snapshot.search_params())
             
-            results = []
+            hits = []
             for distance, idx in zip(distances[0], indices[0]):
                 if idx == -1:
                     continue
                 
-                metadata = self.metadata_store.get(idx, {})
+                metadata = snapshot.metadata_store.get(idx, {})
                 if not metadata.get('has_visual', False):
                     continue
                 
                 # Convert distance to similarity (lower distance = higher similarity)
-                visual_similarity = 1.0 / (1.0 + distance)
+                visual_similarity = 1.0 / (1.0 + float(distance))
                 
-                result = SearchResult(
+                hits.append(RankedHit(
+                    row_id=int(idx),
                     patent_id=metadata.get('patent_id', f'visual_{idx}'),
-                    title=metadata.get('title', ''),
                     similarity_score=0.0,  # No text similarity for visual-only results
                     metadata_score=0.0,
                     final_score=visual_similarity,
-                    patent_text=metadata.get('original_text', ''),
-                    filing_date=metadata.get('filing_date', ''),
-                    assignee=metadata.get('assignee', ''),
-                    technology_class=metadata.get('technology_class', ''),
-                    citation_count=metadata.get('citation_count', 0),
                     visual_similarity=visual_similarity
-                )
-                
-                results.append(result)
+                ))
             
-            return results
+            return hits
             
         except Exception as e:
             logger.error(f"Error in visual similarity search: {e}")
             return []
 
+    def _citation_count(self, patent_id: str, metadata: Dict) -> int:
+        """Citations of a patent from the citation graph, or from its metadata
+        when no citation table has been loaded"""
+        if self.citation_graph.num_citations:
+            return self.citation_graph.citation_count(patent_id)
+        return metadata.get('citation_count', 0)
+
     def _calculate_metadata_score(self, query_text: str, metadata: Dict) -> float:
         """Calculate metadata-based relevance score"""
         try:
@@ -466,7 +1711,7 @@ class IPSemanticSearch:
                 score += 0.3
             
             # Citation count (normalize by log scale)
-            citation_count = metadata.get('citation_count', 0)
+            citation_count = self._citation_count(metadata.get('patent_id'), metadata)
             if citation_count > 0:
                 citation_score = min(0.2, np.log(citation_count + 1) / 10)
                 score += citation_score
@@ -495,43 +1740,56 @@ class IPSemanticSearch:
             logger.warning(f"Error calculating metadata score: {e}")
             return 0.0
 
-    def _combine_search_results(self, text_results: List[SearchResult], 
-                               visual_results: List[SearchResult], 
-                               top_k: int) -> List[SearchResult]:
-        """Combine text and visual search results"""
+    def _combine_hits(self, text_hits: List[RankedHit], 
+                      visual_hits: List[RankedHit], 
+                      top_k: int) -> List[RankedHit]:
+        """Combine text and visual search hits"""
         try:
-            # Create combined results dictionary to avoid duplicates
+            # Create combined hits dictionary to avoid duplicates
             combined_dict = {}
             
-            # Add text results
-            for result in text_results:
-                combined_dict[result.patent_id] = result
+            # Add text hits
+            for hit in text_hits:
+                combined_dict[hit.patent_id] = hit
             
-            # Add or enhance with visual results
-            for visual_result in visual_results:
-                patent_id = visual_result.patent_id
+            # Add or enhance with visual hits
+            for visual_hit in visual_hits:
+                patent_id = visual_hit.patent_id
                 if patent_id in combined_dict:
-                    # Enhance existing result with visual similarity
+                    # Enhance existing hit with visual similarity
                     existing = combined_dict[patent_id]
-                    existing.visual_similarity = visual_result.visual_similarity
+                    existing.visual_similarity = visual_hit.visual_similarity
                     # Recalculate final score with visual component
                     existing.final_score = (
                         existing.final_score * 0.7 + 
-                        visual_result.visual_similarity * 0.3
+                        visual_hit.visual_similarity * 0.3
                     )
                 else:
-                    # Add as new result
-                    combined_dict[patent_id] = visual_result
-            
-            # Convert to list and sort
-            combined_results = list(combined_dict.values())
-            combined_results.sort(key=lambda x: x.final_score, reverse=True)
+                    # Add as new hit
+                    combined_dict[patent_id] = visual_hit
             
-            return combined_results[:top_k]
+            return heapq.nlargest(top_k, combined_dict.values(), key=lambda x: x.final_score)
             
         except Exception as e:
             logger.error(f"Error combining search results: {e}")
-            return text_results[:top_k]
+            return text_hits[:top_k]
+
+    def _collapse_families(self, hits: List[RankedHit], snapshot: IndexSnapshot,
+                           top_k: int) -> List[RankedHit]:
+        """Keep the best ranked hit of each patent family"""
+        seen_families = set()
+        collapsed = []
+        
+        for hit in hits:
+            family_id = snapshot.metadata_store.get(hit.row_id, {}).get('family_id', hit.row_id)
+            if family_id in seen_families:
+                continue
+            seen_families.add(family_id)
+            collapsed.append(hit)
+            if len(collapsed) == top_k:
+                break
+        
+        return collapsed
 
     def _explain_relevance(self, query: str, result: SearchResult) -> str:
         """Generate explanation for why a result is relevant"""
@@ -576,15 +1834,11 @@ class IPSemanticSearch:
     def find_patent_families(self, patent_id: str) -> List[Dict]:
         """Find related patents in the same patent family"""
         try:
-            # Find the patent in metadata
-            target_metadata = None
-            target_index = None
+            snapshot = self._snapshot
             
-            for idx, metadata in self.metadata_store.items():
-                if metadata['patent_id'] == patent_id:
-                    target_metadata = metadata
-                    target_index = idx
-                    break
+            # Find the patent in metadata
+            target_index = snapshot.live_row(patent_id)
+            target_metadata = snapshot.metadata_store.get(target_index) if target_index is not None else None
             
             if not target_metadata:
                 logger.warning(f"Patent {patent_id} not found in index")
@@ -592,7 +1846,7 @@ class IPSemanticSearch:
             
             # Search for similar patents using the patent's own text
             family_results = self._search_text_similarity(
-                target_metadata['original_text'], 20
+                snapshot.documents.get(target_index)['original_text'], 20, snapshot
             )
             
             # Filter out the original patent and apply stricter similarity threshold
@@ -617,11 +1871,143 @@ class IPSemanticSearch:
             logger.error(f"Error finding patent families: {e}")
             return []
 
-    def analyze_citation_network(self, patent_id: str, depth: int = 2) -> Dict:
+    def load_citation_table(self, path: str, **kwargs) -> int:
+        """Ingest a bulk citation table into the citation graph"""
+        count = self.citation_graph.ingest_table(path, **kwargs)
+        logger.info(f"Ingested {count} citations from {path}")
+        return count
+
+    def cluster_patent_families(self, threshold: float = 0.85, chunk_size: int = 1024,
+                                incremental: bool = True) -> int:
+        """
+        Assign a family_id to every indexed patent.
+
+        Runs a range search at ``threshold`` for chunks of document vectors
+        and merges every matching pair with union-find. The family id is the
+        smallest row id in the cluster. In incremental mode only rows without
+        a family_id are queried; their matches are merged into the existing
+        families. The search runs without holding the write lock; if a writer
+        publishes meanwhile the pass is repeated, and the last of
+        ``cluster_publish_attempts`` passes holds the lock throughout.
+        Returns the number of patents whose family changed.
+        """
+        attempts = max(1, self.config.get('cluster_publish_attempts', 3))
+        for attempt in range(1, attempts + 1):
+            if attempt == attempts:
+                # Writers published during every earlier pass; hold the lock for the last one
+                with self._write_lock:
+                    families = self._family_assignments(self._snapshot, threshold, chunk_size, incremental)
+                    snapshot = self._publish_families(families)
+                break
+            
+            # The range search runs on a published snapshot without blocking writers
+            current = self._snapshot
+            families = self._family_assignments(current, threshold, chunk_size, incremental)
+            with self._write_lock:
+                if self._snapshot is current:
+                    snapshot = self._publish_families(families)
+                    break
+            logger.info(f"Index changed while clustering patent families, retrying ({attempt}/{attempts})")
+        
+        if snapshot is not None:
+            self.save_indices(snapshot)
+        logger.info(f"Patent family clustering updated {len(families)} patents")
+        return len(families)
+
+    def _family_assignments(self, current: IndexSnapshot, threshold: float, chunk_size: int,
+                            incremental: bool) -> Dict[int, int]:
+        """New family_id of every live row of a snapshot whose family changes"""
+        segments = current.text_segments()
+        if current.text_count == 0:
+            return {}
+        
+        row_ids = np.concatenate([faiss.vector_to_array(segment.id_map) for segment in segments]).astype(np.int64)
+        tombstones = np.array(sorted(current.tombstones), dtype=np.int64)
+        live = ~np.isin(row_ids, tombstones)
+        
+        # Union-find forest over row ids, seeded with the known families
+        parent = np.arange(current.next_row_id, dtype=np.int64)
+        if incremental:
+            needs_family = np.zeros(len(row_ids), dtype=bool)
+            for position, row_id in enumerate(row_ids):
+                family_id = current.metadata_store.get(row_id, {}).get('family_id')
+                if family_id is None:
+                    needs_family[position] = True
+                else:
+                    parent[row_id] = family_id
+            query_positions = np.flatnonzero(live & needs_family)
+        else:
+            query_positions = np.flatnonzero(live)
+        
+        logger.info(f"Clustering patent families for {len(query_positions)} patents "
+                    f"at similarity {threshold}")
+        
+        for start in range(0, len(query_positions), chunk_size):
+            positions = query_positions[start:start + chunk_size]
+            # Only the queried rows are copied out of the index, one chunk at a time
+            vectors = _reconstruct_positions(segments, positions)
+            lims, _, matches = _range_search_segments(segments, vectors, threshold)
+            
+            sources = np.repeat(row_ids[positions], np.diff(lims).astype(np.int64))
+            keep = ~np.isin(matches, tombstones) & (matches != sources)
+            self._union_rows(parent, sources[keep], matches[keep])
+        
+        # Flatten so every row points straight at its family root
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+        
+        families = {}
+        for row_id in row_ids[live]:
+            family_id = int(parent[row_id])
+            metadata = current.metadata_store.get(row_id)
+            if metadata is not None and metadata.get('family_id') != family_id:
+                families[int(row_id)] = family_id
+        return families
+
+    def _publish_families(self, families: Dict[int, int]) -> Optional[IndexSnapshot]:
+        """Publish family ids computed on the current generation; caller holds the write lock"""
+        if not families:
+            return None
+        current = self._snapshot
+        metadata_store = dict(current.metadata_store)
+        for row_id, family_id in families.items():
+            # Entries are shared with published generations; replace, never mutate
+            metadata_store[row_id] = {**metadata_store[row_id], 'family_id': family_id}
+        
+        snapshot = replace(current, generation=current.generation + 1,
+                           metadata_store=metadata_store)
+        self._publish(snapshot)
+        return snapshot
+
+    @staticmethod
+    def _union_rows(parent: np.ndarray, left: np.ndarray, right: np.ndarray):
+        """Vectorized union of row pairs, linking each root to the smaller one"""
+        def roots(rows: np.ndarray) -> np.ndarray:
+            while True:
+                up = parent[rows]
+                if np.array_equal(up, rows):
+                    return rows
+                rows = up
+        
+        while len(left):
+            left_roots, right_roots = roots(left), roots(right)
+            pending = left_roots != right_roots
+            if not pending.any():
+                break
+            left_roots, right_roots = left_roots[pending], right_roots[pending]
+            np.minimum.at(parent, np.maximum(left_roots, right_roots),
+                          np.minimum(left_roots, right_roots))
+            left, right = left[pending], right[pending]
+
+    def analyze_citation_network(self, patent_id: str, depth: int = 2,
+                                 limit: int = 100) -> Dict:
         """Analyze citation network around a patent"""
         try:
-            # This is a simplified implementation
-            # In practice, you'd need actual citation data from patent databases
+            graph = self.citation_graph
+            snapshot = self._snapshot
             
             citation_data = {
                 'patent_id': patent_id,
@@ -631,21 +2017,46 @@ class IPSemanticSearch:
                 'influence_score': 0.0
             }
             
-            # Find patents that cite this one (forward citations)
-            search_results = self._search_text_similarity(
-                f"citing patent {patent_id}", 50
-            )
-            
-            for result in search_results[:10]:  # Limit to top 10
-                if result.patent_id != patent_id:
-                    citation_data['forward_citations'].append({
-                        'patent_id': result.patent_id,
-                        'title': result.title,
-                        'similarity': result.similarity_score
+            if patent_id not in graph:
+                logger.warning(f"Patent {patent_id} not found in citation graph")
+                return citation_data
+            
+            scores = graph.influence_scores()
+            
+            def describe(nodes: np.ndarray, hops: np.ndarray) -> List[Dict]:
+                # Nearest first, most influential first within each hop
+                order = np.lexsort((-scores[nodes], hops))[:limit]
+                described = []
+                for node, node_hops in zip(nodes[order], hops[order]):
+                    cited_id = graph.patent_id(node)
+                    row_id = snapshot.live_row(cited_id)
+                    metadata = snapshot.metadata_store.get(row_id, {}) if row_id is not None else {}
+                    described.append({
+                        'patent_id': cited_id,
+                        'title': metadata.get('title', ''),
+                        'depth': int(node_hops),
+                        'influence': float(scores[node])
                     })
+                return described
+            
+            forward_nodes, forward_hops = graph.traverse_nodes(patent_id, depth, 'forward')
+            backward_nodes, backward_hops = graph.traverse_nodes(patent_id, depth, 'backward')
+            
+            citation_data['forward_citations'] = describe(forward_nodes, forward_hops)
+            citation_data['backward_citations'] = describe(backward_nodes, backward_hops)
+            citation_data['forward_citation_count'] = len(forward_nodes)
+            citation_data['backward_citation_count'] = len(backward_nodes)
             
-            # Calculate influence score based on citation patterns
-            citation_data['influence_score'] = len(citation_data['forward_citations']) * 0.1
+            forward_counts = np.bincount(forward_hops, minlength=depth + 1)
+            backward_counts = np.bincount(backward_hops, minlength=depth + 1)
+            for hops in range(1, depth + 1):
+                citation_data['citation_clusters'].append({
+                    'depth': hops,
+                    'forward_count': int(forward_counts[hops]),
+                    'backward_count': int(backward_counts[hops])
+                })
+            
+            citation_data['influence_score'] = graph.influence(patent_id)
             
             return citation_data
             
@@ -719,45 +2130,115 @@ class IPSemanticSearch:
             logger.error(f"Error in technology trend analysis: {e}")
             return {'error': str(e)}
 
-    def save_indices(self):
-        """Save FAISS indices and metadata to disk"""
+    def save_indices(self, snapshot: Optional[IndexSnapshot] = None):
+        """
+        Save FAISS indices and metadata to disk.
+
+        Every save writes a complete generation into its own directory and
+        then swaps the ``CURRENT`` pointer file with a single rename, so a
+        crash mid-save leaves the previously saved generation in place.
+        """
+        snapshot = snapshot or self._snapshot
+        index_path = self.config.get('index_path', './indices/')
+        generation_dir = f'generation-{snapshot.generation:08d}-{time.time_ns():x}'
+        target = os.path.join(index_path, generation_dir)
+        with self._save_lock:
+            # Directories still being written must survive other saves' cleanup
+            self._saves_in_progress.add(generation_dir)
+        
         try:
-            index_path = self.config.get('index_path', './indices/')
-            os.makedirs(index_path, exist_ok=True)
+            os.makedirs(target)
             
-            # Save text index
-            text_index_file = os.path.join(index_path, 'text_index.faiss')
-            faiss.write_index(self.text_index, text_index_file)
+            # Save text index; the delta segment stays separate and is folded on load
+            faiss.write_index(snapshot.text_index, os.path.join(target, 'text_index.faiss'))
+            if snapshot.text_delta is not None and snapshot.text_delta.ntotal > 0:
+                faiss.write_index(snapshot.text_delta, os.path.join(target, 'text_delta.faiss'))
             
             # Save visual index if it exists
-            if self.visual_index and self.visual_index.ntotal > 0:
-                visual_index_file = os.path.join(index_path, 'visual_index.faiss')
-                faiss.write_index(self.visual_index, visual_index_file)
+            if snapshot.visual_index and snapshot.visual_index.ntotal > 0:
+                faiss.write_index(snapshot.visual_index, os.path.join(target, 'visual_index.faiss'))
+            if snapshot.visual_delta is not None and snapshot.visual_delta.ntotal > 0:
+                faiss.write_index(snapshot.visual_delta, os.path.join(target, 'visual_delta.faiss'))
             
             # Save metadata
-            metadata_file = os.path.join(index_path, 'metadata.pkl')
-            with open(metadata_file, 'wb') as f:
-                pickle.dump(self.metadata_store, f)
+            with open(os.path.join(target, 'metadata.pkl'), 'wb') as f:
+                pickle.dump(dict(snapshot.metadata_store), f)
+            
+            # Save compressed patent text
+            snapshot.documents.save(os.path.join(target, 'documents.pkl'))
+            
+            # Save citation graph edges
+            if self.citation_graph.num_citations:
+                self.citation_graph.save(os.path.join(target, 'citation_graph.npz'))
+            
+            # Save tombstones and row id allocation
+            with open(os.path.join(target, 'index_state.pkl'), 'wb') as f:
+                pickle.dump({
+                    'generation': snapshot.generation,
+                    'tombstones': set(snapshot.tombstones),
+                    'next_row_id': snapshot.next_row_id
+                }, f)
+            
+            with self._save_lock:
+                previous = self._saved_generation(index_path)
+                if previous is not None and previous[0] > snapshot.generation:
+                    # A newer generation was saved while this one was written
+                    shutil.rmtree(target, ignore_errors=True)
+                    return True
+                if not os.path.isdir(target):
+                    raise FileNotFoundError(f"Generation directory {target} disappeared before publishing")
+                pointer_file = os.path.join(index_path, 'CURRENT')
+                with open(pointer_file + '.tmp', 'w') as f:
+                    f.write(generation_dir)
+                os.replace(pointer_file + '.tmp', pointer_file)
+                self._remove_old_generations(
+                    index_path, keep={generation_dir, previous and previous[1]} | self._saves_in_progress
+                )
             
-            logger.info(f"Indices saved successfully to {index_path}")
+            logger.info(f"Indices saved successfully to {target}")
             return True
             
         except Exception as e:
             logger.error(f"Error saving indices: {e}")
             return False
+        
+        finally:
+            with self._save_lock:
+                self._saves_in_progress.discard(generation_dir)
+
+    @staticmethod
+    def _saved_generation(index_path: str) -> Optional[Tuple[int, str]]:
+        """Generation number and directory the CURRENT pointer refers to"""
+        pointer_file = os.path.join(index_path, 'CURRENT')
+        if not os.path.exists(pointer_file):
+            return None
+        with open(pointer_file) as f:
+            generation_dir = f.read().strip()
+        return int(generation_dir.split('-')[1]), generation_dir
+
+    @staticmethod
+    def _remove_old_generations(index_path: str, keep: set):
+        """Delete saved generations other than the current, previous and in-progress ones"""
+        for name in os.listdir(index_path):
+            if name.startswith('generation-') and name not in keep:
+                shutil.rmtree(os.path.join(index_path, name), ignore_errors=True)
 
     def get_search_statistics(self) -> Dict:
         """Get statistics about the search index"""
         try:
-            total_patents = self.text_index.ntotal if self.text_index else 0
-            visual_patents = self.visual_index.ntotal if self.visual_index else 0
+            snapshot = self._snapshot
+            total_patents = snapshot.text_count - len(snapshot.tombstones) if snapshot.text_index else 0
+            visual_patents = snapshot.visual_count if snapshot.visual_index else 0
             
             # Analyze metadata for additional stats
             assignee_counts = {}
             tech_class_counts = {}
             year_counts = {}
             
-            for metadata in self.metadata_store.values():
+            for idx, metadata in snapshot.metadata_store.items():
+                if idx in snapshot.tombstones:
+                    continue
+                
                 # Assignee distribution
                 assignee = metadata.get('assignee', 'Unknown')
                 assignee_counts[assignee] = assignee_counts.get(assignee, 0) + 1
@@ -788,32 +2269,36 @@ class IPSemanticSearch:
                     'latest': max(year_counts.keys()) if year_counts else 'Unknown',
                     'total_years': len(year_counts)
                 },
-                'index_size_mb': self._estimate_index_size()
+                'index_size_mb': self._estimate_index_size(snapshot),
+                'index_generation': snapshot.generation,
+                'deleted_pending_compaction': len(snapshot.tombstones)
             }
             
         except Exception as e:
             logger.error(f"Error getting search statistics: {e}")
             return {'error': str(e)}
 
-    def _estimate_index_size(self) -> float:
+    def _estimate_index_size(self, snapshot: Optional[IndexSnapshot] = None) -> float:
         """Estimate the size of indices in MB"""
         try:
+            snapshot = snapshot or self._snapshot
             size_mb = 0.0
             
-            if self.text_index:
+            if snapshot.text_index:
                 # Rough estimate: 4 bytes per float * dimensions * number of vectors
-                embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
-                text_size = (4 * embedding_dim * self.text_index.ntotal) / (1024 * 1024)
+                embedding_dim = snapshot.text_index.d
+                text_size = (4 * embedding_dim * snapshot.text_count) / (1024 * 1024)
                 size_mb += text_size
             
-            if self.visual_index:
+            if snapshot.visual_index:
                 visual_dim = self.visual_model['dimension']
-                visual_size = (4 * visual_dim * self.visual_index.ntotal) / (1024 * 1024)
+                visual_size = (4 * visual_dim * snapshot.visual_count) / (1024 * 1024)
                 size_mb += visual_size
             
-            # Add metadata size estimate
-            metadata_size = len(str(self.metadata_store)) / (1024 * 1024)
+            # Add metadata and compressed text size estimates
+            metadata_size = len(str(snapshot.metadata_store)) / (1024 * 1024)
             size_mb += metadata_size
+            size_mb += snapshot.documents.nbytes / (1024 * 1024)
             
             return round(size_mb, 2)
             
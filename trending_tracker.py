@@ -0,0 +1,163 @@
+"""
+Incremental trending-technology counters shared by the semantic search engines
+Concept counts are updated on ingest and kept per time window (in days, by
+creation_date), so dashboards read the top concepts without rescanning assets
+"""
+
+import heapq
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+class TrendingTracker:
+    """Running concept counters with sliding windows over daily buckets
+
+    Each window is a running Counter fed from a ring buffer of daily buckets;
+    the window ends on the query date (today, or the ``now`` argument), so a
+    record dated in the future cannot drag the windows forward: it counts
+    towards the all-time totals only. The top-k of
+    every window is kept up to date as counts grow, so reads cost O(k). Only
+    when days fall out of a window (at most once per new day) is that
+    window's top-k dropped and rebuilt by a full rescan on the next read.
+    """
+
+    def __init__(self, windows: Tuple[int, ...] = (7, 30, 90), k: int = 20):
+        self.windows = tuple(sorted(windows))
+        self.k = k
+        self.span = self.windows[-1]
+        self.buckets = [Counter() for _ in range(self.span)]
+        self.bucket_days = [None] * self.span
+        self.latest_day = None
+        self.total_counts = Counter()
+        self.window_counts = {window: Counter() for window in self.windows}
+        # window (None = all time) -> (k, {concept: count}) of the current top-k
+        self._top = {}
+
+    def to_state(self) -> Dict:
+        """Counters as plain dicts and lists, independent of where this class lives"""
+        return {
+            'windows': list(self.windows),
+            'k': self.k,
+            'latest_day': self.latest_day,
+            'bucket_days': list(self.bucket_days),
+            'buckets': [dict(bucket) for bucket in self.buckets],
+            'total_counts': dict(self.total_counts),
+            'window_counts': {window: dict(counts) for window, counts in self.window_counts.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'TrendingTracker':
+        tracker = cls(windows=tuple(state['windows']), k=state['k'])
+        tracker.latest_day = state['latest_day']
+        tracker.bucket_days = list(state['bucket_days'])
+        tracker.buckets = [Counter(bucket) for bucket in state['buckets']]
+        tracker.total_counts = Counter(state['total_counts'])
+        tracker.window_counts = {window: Counter(counts) for window, counts in state['window_counts'].items()}
+        return tracker
+
+    @staticmethod
+    def _to_day(creation_date) -> Optional[int]:
+        if isinstance(creation_date, (date, datetime)):
+            return creation_date.toordinal()
+        try:
+            return date.fromisoformat(str(creation_date)[:10]).toordinal()
+        except (TypeError, ValueError):
+            return None
+
+    def _today(self, now=None) -> int:
+        day = self._to_day(now) if now is not None else None
+        return day if day is not None else date.today().toordinal()
+
+    @staticmethod
+    def _rank(item):
+        # Highest count first, ties by concept name so results are deterministic
+        return -item[1], item[0]
+
+    def _counts(self, window_days: Optional[int]) -> Counter:
+        return self.total_counts if window_days is None else self.window_counts[window_days]
+
+    def _bump_top(self, window_days: Optional[int], concepts: List[str]):
+        """Fold increments into a cached top-k; counts only grew, so any concept
+        outside the top-k that now reaches the k-th entry is a candidate"""
+        cached = self._top.get(window_days)
+        if cached is None:
+            return
+        k, top = cached
+        counts = self._counts(window_days)
+        threshold = min(top.values()) if len(top) >= k else 0
+        changed = False
+        for concept in concepts:
+            if concept in top or counts[concept] >= threshold:
+                top[concept] = counts[concept]
+                changed = True
+        if changed and len(top) > k:
+            self._top[window_days] = (k, dict(sorted(top.items(), key=self._rank)[:k]))
+
+    def _advance(self, day: int):
+        """Move the window end forward, evicting the buckets that fall out of each window"""
+        previous = self.latest_day
+        self.latest_day = day
+        if previous is None:
+            return
+
+        for window, counts in self.window_counts.items():
+            if day - previous >= window:
+                counts.clear()
+                self._top.pop(window, None)
+                continue
+            evicted = False
+            for old_day in range(previous - window + 1, day - window + 1):
+                slot = old_day % self.span
+                if self.bucket_days[slot] == old_day:
+                    counts.subtract(self.buckets[slot])
+                    evicted = True
+            if evicted:
+                self.window_counts[window] = +counts
+                # Counts went down: the cached top-k may have lost members
+                self._top.pop(window, None)
+
+        for old_day in range(max(previous + 1, day - self.span + 1), day + 1):
+            slot = old_day % self.span
+            self.buckets[slot].clear()
+            self.bucket_days[slot] = None
+
+    def add(self, concepts: List[str], creation_date=None, now=None):
+        """Count one asset's concepts"""
+        self.total_counts.update(concepts)
+        self._bump_top(None, concepts)
+
+        today = self._today(now)
+        if self.latest_day is None or today > self.latest_day:
+            self._advance(today)
+
+        day = self._to_day(creation_date)
+        if day is None or day > self.latest_day:
+            return
+        age = self.latest_day - day
+        if not concepts or age >= self.span:
+            return
+
+        slot = day % self.span
+        self.buckets[slot].update(concepts)
+        self.bucket_days[slot] = day
+        for window, counts in self.window_counts.items():
+            if age < window:
+                counts.update(concepts)
+                self._bump_top(window, concepts)
+
+    def top(self, window_days: Optional[int] = None, k: Optional[int] = None, now=None) -> Dict[str, int]:
+        """Top-k concepts overall or within the window_days days up to today (or ``now``)"""
+        k = self.k if k is None else k
+        if window_days is not None and window_days not in self.window_counts:
+            raise ValueError(f"Unsupported window: {window_days} days (available: {self.windows})")
+
+        today = self._today(now)
+        if self.latest_day is None or today > self.latest_day:
+            self._advance(today)
+
+        cached = self._top.get(window_days)
+        if cached is None or cached[0] < k:
+            counts = self._counts(window_days)
+            cached = (max(k, self.k), dict(heapq.nsmallest(max(k, self.k), counts.items(), key=self._rank)))
+            self._top[window_days] = cached
+        return dict(sorted(cached[1].items(), key=self._rank)[:k])
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Valuation throughput benchmark
+Times single-asset latency, batch throughput and peak memory for the
+valuation engines on a seeded synthetic portfolio, writes machine-readable
+results and fails when a run regresses against a stored baseline
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+VOCABULARY = [
+    'system', 'method', 'apparatus', 'device', 'processor', 'memory', 'network', 'signal',
+    'wherein', 'comprising', 'plurality', 'configured', 'controller', 'interface', 'module',
+    'transmission', 'authentication', 'cryptographic', 'distributed', 'configuration',
+    'semiconductor', 'electrode', 'algorithm', 'architecture', 'substrate', 'wireless',
+    'the', 'a', 'of', 'to', 'and', 'in', 'for', 'said', 'at', 'least', 'one', 'first', 'second'
+]
+
+INDUSTRIES = ['software', 'healthcare', 'fintech', 'ai', 'blockchain', 'iot', 'energy', 'automotive']
+TECHNOLOGY_AREAS = ['ai', 'blockchain', 'quantum computing', 'biotech', 'clean energy', 'robotics', 'optics']
+
+def words(rng: random.Random, low: int, high: int) -> str:
+    return ' '.join(rng.choices(VOCABULARY, k=rng.randint(low, high)))
+
+def generate_assets(count: int, seed: int) -> list:
+    """Seeded synthetic assets with patent-like claim and description lengths"""
+    rng = random.Random(seed)
+    assets = []
+    for i in range(count):
+        assets.append({
+            'id': f'bench_{i:07d}',
+            'title': words(rng, 4, 12),
+            # Independent and dependent claims run roughly 30-150 words
+            'claims': [words(rng, 30, 150) for _ in range(rng.randint(1, 20))],
+            'description': ('Novel ' if rng.random() < 0.3 else '') + words(rng, 150, 400),
+            'prior_art': [{'similarity': rng.random()} for _ in range(rng.randint(0, 8))],
+            'technical_details': {
+                'component_count': rng.randint(0, 12),
+                'integration_count': rng.randint(0, 6),
+                'algorithm_count': rng.randint(0, 4)
+            },
+            'market_data': {'technology_readiness': rng.randint(1, 10), 'adoption_barriers': rng.randint(0, 10)},
+            'competitors': [{'strength': rng.random()} for _ in range(rng.randint(0, 5))],
+            'industry': rng.choice(INDUSTRIES),
+            'technology_area': rng.choice(TECHNOLOGY_AREAS),
+            'financial_data': {
+                'projected_annual_revenue': rng.uniform(1e5, 5e7),
+                'market_penetration': rng.uniform(0.001, 0.1)
+            },
+            'licensing_data': {'licensing_potential': rng.random(), 'expected_royalty_rate': rng.uniform(0.01, 0.12)},
+            'development_data': {'estimated_cost': rng.uniform(1e5, 1e7)},
+            'risk_data': {'technical_risk': rng.random(), 'market_risk': rng.random(), 'regulatory_risk': rng.random()},
+            'base_valuation': rng.uniform(1e5, 5e6)
+        })
+    return assets
+
+def load_script(filename: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def ai_valuation_engine():
+    module = load_script('ai-valuation-engine.py', 'ai_valuation_engine')
+    engine = module.IPValuationEngine()
+    return {
+        'single': engine.evaluate_ip_asset,
+        'batch': lambda assets: engine.batch_evaluate(assets),
+        'batch_array': lambda assets: engine.batch_evaluate(assets, as_array=True),
+    }
+
+def scalable_valuation_engine():
+    module = load_script('performance-optimizer.py', 'performance_optimizer')
+    engine = module.ScalableValuationEngine()
+    return {
+        'single': engine._compute_valuation,
+        'batch': lambda assets: [engine._compute_valuation(asset) for asset in assets],
+    }
+
+def flask_valuation_mock():
+    client = load_script('api-server.py', 'api_server').app.test_client()
+    return {'single': lambda asset: client.post('/api/valuation', json=asset).get_json()}
+
+def flask_prediction_mock():
+    client = load_script('simple-api-server.py', 'simple_api_server').app.test_client()
+
+    def predict(asset):
+        return client.post('/api/predict', json={
+            'num_claims': len(asset['claims']),
+            'num_citations': len(asset['prior_art']),
+            'citation_density': len(asset['prior_art']) / max(len(asset['claims']), 1),
+            'market_sentiment': asset['licensing_data']['licensing_potential'],
+            'technical_complexity': asset['technical_details']['component_count'] / 12,
+            'market_adoption': asset['market_data']['technology_readiness'] / 10
+        }).get_json()
+    return {'single': predict}
+
+ENGINES = {
+    'ai_valuation_engine': ai_valuation_engine,
+    'scalable_valuation_engine': scalable_valuation_engine,
+    'flask_valuation_mock': flask_valuation_mock,
+    'flask_prediction_mock': flask_prediction_mock,
+}
+
+# Metrics where a larger value is a regression
+LOWER_IS_BETTER = ('latency_p50_ms', 'latency_p95_ms', 'peak_memory_mb')
+
+def measure_single(single, assets: list) -> dict:
+    """Per-call latency over distinct assets, so memo caches never hit"""
+    timings = []
+    for asset in assets:
+        start = time.perf_counter()
+        single(asset)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'latency_p50_ms': statistics.median(timings),
+        'latency_p95_ms': timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1],
+    }
+
+def measure_batch(batch, assets: list, repeats: int) -> dict:
+    """Best-of throughput plus tracemalloc peak of one batch call"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        batch(assets)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    batch(assets)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'assets_per_second': len(assets) / best, 'peak_memory_mb': peak / 2 ** 20}
+
+def run_engine(name: str, single_assets: list, batch_assets: list, repeats: int) -> dict:
+    try:
+        paths = ENGINES[name]()
+    except ImportError as e:
+        return {'engine': name, 'skipped': f'missing dependency: {e.name}'}
+
+    result = {'engine': name}
+    result.update(measure_single(paths['single'], single_assets))
+    for path in ('batch', 'batch_array'):
+        if path in paths:
+            metrics = measure_batch(paths[path], batch_assets, repeats)
+            result.update({f'{path}_{metric}': value for metric, value in metrics.items()})
+    return result
+
+def regressions(results: list, baseline: dict, tolerance: float) -> list:
+    failures = []
+    for result in results:
+        previous = baseline.get(result['engine'])
+        if not previous or 'skipped' in result or 'skipped' in previous:
+            continue
+        for metric, value in result.items():
+            if metric == 'engine' or metric not in previous:
+                continue
+            before = previous[metric]
+            if metric.endswith(LOWER_IS_BETTER):
+                worse = value > before * (1 + tolerance)
+            else:
+                worse = value < before * (1 - tolerance)
+            if worse:
+                failures.append(f"{result['engine']} {metric}: {before:.3f} -> {value:.3f}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('engines', nargs='*', default=list(ENGINES), help=f"any of: {', '.join(ENGINES)}")
+    parser.add_argument('--assets', type=int, default=5000, help='batch size for throughput runs')
+    parser.add_argument('--single', type=int, default=200, help='calls for latency measurement')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='JSON file with results of a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed regression against the baseline, as a fraction')
+    args = parser.parse_args()
+
+    unknown = set(args.engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(sorted(unknown))}")
+
+    batch_assets = generate_assets(args.assets, args.seed)
+    single_assets = generate_assets(args.single, args.seed + 1)
+
+    results = []
+    for name in args.engines:
+        result = run_engine(name, single_assets, batch_assets, args.repeats)
+        results.append(result)
+        if 'skipped' in result:
+            print(f"{name}: skipped ({result['skipped']})")
+            continue
+        summary = ', '.join(f"{metric} {value:,.3f}" for metric, value in result.items() if metric != 'engine')
+        print(f"{name}: {summary}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'seed': args.seed, 'assets': args.assets, 'results': results}, f, indent=2)
+
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = {entry['engine']: entry for entry in json.load(f)['results']}
+        failures = regressions(results, baseline, args.tolerance)
+        if failures:
+            for failure in failures:
+                print(f"REGRESSION: {failure}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+if __name__ == "__main__":
+    main()